@@ -1,5 +1,7 @@
-from flask import Flask
-from app.extensions import db, migrate, admin, login_manager
+import os
+from itertools import islice
+from flask import Flask, url_for
+from app.extensions import db, migrate, admin, login_manager, cache, limiter, mail
 from app.config import Config
 
 def create_app(config_class=Config):
@@ -10,6 +12,9 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    cache.init_app(app)
+    limiter.init_app(app)
+    mail.init_app(app)
     
     # Import models (this must be done after db initialization)
     from app.models import (
@@ -21,21 +26,55 @@ def create_app(config_class=Config):
     # User loader for Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return User.get_cached(user_id)
     
     # Custom Jinja filters
     @app.template_filter('batch')
     def batch_filter(iterable, count, fill_with=None):
         """Batch items into groups of specified count"""
+        # Chunks are pulled straight from the iterator rather than slicing a
+        # full copy. The result stays a list since templates iterate it more
+        # than once and take its length.
         result = []
-        items = list(iterable)
-        for i in range(0, len(items), count):
-            batch = items[i:i+count]
+        items = iter(iterable)
+        while True:
+            batch = list(islice(items, count))
+            if not batch:
+                break
             if fill_with is not None:
                 batch.extend([fill_with] * (count - len(batch)))
             result.append(batch)
         return result
     
+    # Fingerprint static URLs (?v=<mtime>) so nginx/CDN can cache them as immutable
+    static_versions = {}
+    
+    @app.url_defaults
+    def static_fingerprint(endpoint, values):
+        if endpoint != 'static' or 'filename' not in values or 'v' in values:
+            return
+        filename = values['filename']
+        version = None if app.debug else static_versions.get(filename)
+        if version is None:
+            try:
+                version = int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+            except OSError:
+                return
+            static_versions[filename] = version
+        values['v'] = version
+    
+    # Serve static files from the CDN in production
+    if app.config.get('CDN_DOMAIN'):
+        cdn_root = f"https://{app.config['CDN_DOMAIN']}"
+        
+        def cdn_url_for(endpoint, **values):
+            url = url_for(endpoint, **values)
+            if endpoint == 'static' and not values.get('_external'):
+                return cdn_root + url
+            return url
+        
+        app.jinja_env.globals['url_for'] = cdn_url_for
+    
     # Register blueprints
     from app.main import bp as main_bp
     app.register_blueprint(main_bp)
@@ -64,4 +103,29 @@ def create_app(config_class=Config):
         print(f"⚠️  Flask-Admin not available: {e}")
         print("   To enable admin panel: pip install Flask-Admin")
     
+    # Surface slow queries (and N+1 bursts) in the log during development
+    if app.config.get('SQLALCHEMY_RECORD_QUERIES'):
+        from flask_sqlalchemy.record_queries import get_recorded_queries
+        
+        @app.after_request
+        def log_slow_queries(response):
+            for query in get_recorded_queries():
+                if query.duration >= app.config['SLOW_QUERY_THRESHOLD']:
+                    app.logger.warning('Slow query (%.0f ms) at %s: %s',
+                                       query.duration * 1000, query.location, query.statement)
+            return response
+    
+    # Endpoint profiling (latency, outliers, per-function profiles)
+    if app.config['MONITORING_DASHBOARD']:
+        try:
+            import flask_monitoringdashboard as monitoring
+            monitoring.config.init_from(file=app.config['MONITORING_DASHBOARD_CONFIG'])
+            monitoring.config.username = app.config['MONITORING_DASHBOARD_USERNAME']
+            monitoring.config.password = app.config['MONITORING_DASHBOARD_PASSWORD'] or app.config['SECRET_KEY']
+            monitoring.bind(app)
+            print("✅ Monitoring dashboard enabled at /monitoring")
+        except ImportError as e:
+            print(f"⚠️  Flask-MonitoringDashboard not available: {e}")
+            print("   To enable profiling: pip install Flask-MonitoringDashboard")
+    
     return app
@@ -1,93 +1,256 @@
-from flask import url_for, redirect, request, flash, current_app
+from flask import url_for, redirect, request, flash, current_app, make_response, g
 from flask_admin import Admin, AdminIndexView, expose, BaseView
 from flask_admin.contrib.sqla import ModelView
 from flask_admin.form import Select2Widget
 from wtforms import SelectField, TextAreaField, BooleanField
 from wtforms.widgets import TextArea
+from jinja2 import pass_context
 from datetime import datetime, timedelta
-from app.extensions import db
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, case, literal, select, union_all, inspect
+from sqlalchemy.orm import joinedload, selectinload, defer, load_only
+from app.extensions import db, cache
 from app.models import (
     User, Post, Comment, Category, Collection, Tag, ContactMessage, 
     NewsletterSubscriber, Author, Publisher, BookCategory, Book, 
-    BookReview, Testimonial, LibraryStats
+    BookReview, Testimonial, LibraryStats, post_tags, book_tags, book_authors,
+    estimated_count, estimate_cache_key
 )
 
 class CKTextAreaWidget(TextArea):
     def __call__(self, field, **kwargs):
-        if kwargs.get('class'):
-            kwargs['class'] += ' ckeditor'
-        else:
-            kwargs.setdefault('class', 'ckeditor')
-        return super(CKTextAreaWidget, self).__call__(field, **kwargs)
+        css_class = kwargs.get('class')
+        kwargs['class'] = f'{css_class} ckeditor' if css_class else 'ckeditor'
+        return super().__call__(field, **kwargs)
 
 class CKTextAreaField(TextAreaField):
     widget = CKTextAreaWidget()
 
 class SecureModelView(ModelView):
+    # Use the planner's row estimate instead of COUNT(*) for unfiltered list pages
+    fast_count = False
+    
+    # Count columns shown in the list: {column name: callable(ids) returning a
+    # query of (id, count) rows}. Replaces one COUNT per row with one per page.
+    column_counts = {}
+    
+    # Cache keys shared with the admin panel, dropped whenever a model of this
+    # view is saved or deleted
+    invalidate_cache_keys = ()
+    
     def is_accessible(self):
         # For development, allow access to all. In production, add authentication check
         return True
     
     def inaccessible_callback(self, name, **kwargs):
         return redirect(url_for('admin.index'))
+    
+    def get_count_query(self):
+        """Count on the primary key so the planner can use the pkey index;
+        None (no COUNT) while get_list serves an unfiltered fast_count page"""
+        if g.get('admin_estimated_count'):
+            return None
+        return self.session.query(func.count(inspect(self.model).primary_key[0]))
+    
+    def get_list(self, page, sort_column, sort_desc, search, filters,
+                 execute=True, page_size=None):
+        # Unfiltered fast_count pages show the shared table estimate
+        # (models.estimated_count) instead of running COUNT(*)
+        use_estimate = self.fast_count and not search and not filters
+        g.admin_estimated_count = use_estimate
+        try:
+            count, query = super().get_list(page, sort_column, sort_desc, search, filters,
+                                            execute=execute, page_size=page_size)
+        finally:
+            g.admin_estimated_count = False
+        if use_estimate:
+            count = estimated_count(self.model)
+        
+        if execute and self.column_counts:
+            self._load_column_counts(query)
+        return count, query
+    
+    def _load_column_counts(self, models):
+        """Resolve every column_counts entry for the page with one GROUP BY each"""
+        ids = [m.id for m in models]
+        if not ids:
+            return
+        counts = {name: dict(count_query(ids).all())
+                  for name, count_query in self.column_counts.items()}
+        for m in models:
+            m._column_counts = {name: values.get(m.id, 0) for name, values in counts.items()}
+    
+    def after_model_change(self, form, model, is_created):
+        if self.invalidate_cache_keys:
+            cache.delete_many(*self.invalidate_cache_keys)
+        if self.fast_count and is_created:
+            cache.delete(estimate_cache_key(self.model))
+    
+    def after_model_delete(self, model):
+        if self.invalidate_cache_keys:
+            cache.delete_many(*self.invalidate_cache_keys)
+        if self.fast_count:
+            cache.delete(estimate_cache_key(self.model))
+    
+    @pass_context
+    def get_list_value(self, context, model, name):
+        column_counts = getattr(model, '_column_counts', None)
+        if column_counts and name in column_counts:
+            return column_counts[name]
+        return super().get_list_value(context, model, name)
+
+def _run_concurrently(*funcs):
+    """Run independent query functions in parallel, each in its own app context
+    (and therefore its own session/connection). SQLite serializes access to the
+    database anyway, so there the functions simply run one after the other."""
+    if db.engine.dialect.name == 'sqlite':
+        return [f() for f in funcs]
+    
+    app = current_app._get_current_object()
+    
+    def call(f):
+        with app.app_context():
+            return f()
+    
+    with ThreadPoolExecutor(max_workers=min(6, len(funcs))) as executor:
+        return list(executor.map(call, funcs))
+
+def _post_stats():
+    total_posts, published_posts, draft_posts = db.session.query(
+        func.count(Post.id),
+        func.sum(case((Post.published == True, 1), else_=0)),
+        func.sum(case((Post.published == False, 1), else_=0))
+    ).one()
+    # SUM() over an empty table is NULL, hence the "or 0"
+    return {
+        'total_posts': total_posts,
+        'published_posts': published_posts or 0,
+        'draft_posts': draft_posts or 0
+    }
+
+def _comment_stats():
+    total_comments, pending_comments = db.session.query(
+        func.count(Comment.id),
+        func.sum(case((Comment.approved == False, 1), else_=0))
+    ).one()
+    return {
+        'total_comments': total_comments,
+        'pending_comments': pending_comments or 0
+    }
+
+def _library_stats():
+    total_reviews, pending_reviews = db.session.query(
+        func.sum(case((BookReview.is_approved == True, 1), else_=0)),
+        func.sum(case((BookReview.is_approved == False, 1), else_=0))
+    ).one()
+    return {
+        'total_books': Book.query.filter_by(is_published=True).count(),
+        'total_authors': Author.query.count(),
+        'total_reviews': total_reviews or 0,
+        'pending_reviews': pending_reviews or 0
+    }
+
+def _general_stats():
+    total_testimonials, pending_testimonials = db.session.query(
+        func.sum(case((Testimonial.is_active == True, 1), else_=0)),
+        func.sum(case((Testimonial.is_active == False, 1), else_=0))
+    ).one()
+    return {
+        'total_testimonials': total_testimonials or 0,
+        'pending_testimonials': pending_testimonials or 0,
+        'total_messages': ContactMessage.query.filter_by(responded=False).count(),
+        'total_subscribers': NewsletterSubscriber.query.filter_by(subscribed=True).count()
+    }
+
+@cache.memoize(60)
+def _compute_dashboard_stats():
+    """Aggregate counts shown on the admin dashboard"""
+    stats = {}
+    for partial in _run_concurrently(_post_stats, _comment_stats,
+                                     _library_stats, _general_stats):
+        stats.update(partial)
+    return stats
+
+@cache.memoize(300)
+def _compute_blog_stats():
+    """Aggregate blog figures shown on the analytics page"""
+    approved_comments_q = db.session.query(func.count(Comment.id)).filter(
+        Comment.approved == True
+    ).scalar_subquery()
+    total_posts, published_posts, total_views, approved_comments = db.session.query(
+        func.count(Post.id),
+        func.sum(case((Post.published == True, 1), else_=0)),
+        func.sum(Post.views),
+        approved_comments_q
+    ).one()
+    published_posts = published_posts or 0
+    return {
+        'total_posts': total_posts,
+        'published_posts': published_posts,
+        'total_views': total_views or 0,
+        'total_comments': approved_comments,
+        'avg_comments_per_post': approved_comments / max(1, published_posts)
+    }
+
+def invalidate_stats_cache():
+    """Drop cached dashboard/analytics figures after content changes"""
+    cache.delete_memoized(_compute_dashboard_stats)
+    cache.delete_memoized(_compute_blog_stats)
+
+def _latest_changes():
+    """Most recent change to each table listed on the dashboard/analytics pages"""
+    return db.session.query(
+        select(func.max(Post.updated_at)).scalar_subquery(),
+        select(func.max(Comment.updated_at)).scalar_subquery(),
+        select(func.max(Book.updated_at)).scalar_subquery(),
+        select(func.max(ContactMessage.id)).scalar_subquery()
+    ).one()
+
+def _conditional_response(stats, render):
+    """Answer 304 when the browser already holds this version of the page,
+    otherwise render it. Either way the page may be reused privately for 30s."""
+    etag = hashlib.md5(f'{sorted(stats.items())}|{tuple(_latest_changes())}'.encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = 30
+    return response
 
 class DashboardView(AdminIndexView):
     @expose('/')
     def index(self):
-        # Blog Statistics
-        total_posts = Post.query.count()
-        published_posts = Post.query.filter_by(published=True).count()
-        draft_posts = Post.query.filter_by(published=False).count()
-        total_comments = Comment.query.count()
-        pending_comments = Comment.query.filter_by(approved=False).count()
-        
-        # Library Statistics
-        total_books = Book.query.filter_by(is_published=True).count()
-        total_authors = Author.query.count()
-        total_reviews = BookReview.query.filter_by(is_approved=True).count()
-        pending_reviews = BookReview.query.filter_by(is_approved=False).count()
-        
-        # General Statistics
-        total_testimonials = Testimonial.query.filter_by(is_active=True).count()
-        pending_testimonials = Testimonial.query.filter_by(is_active=False).count()
-        total_messages = ContactMessage.query.filter_by(responded=False).count()
-        total_subscribers = NewsletterSubscriber.query.filter_by(subscribed=True).count()
-        
+        stats = _compute_dashboard_stats()
+        return _conditional_response(stats, lambda: self._render_dashboard(stats))
+    
+    def _render_dashboard(self, stats):
         # Recent Activity
-        recent_posts = Post.query.order_by(Post.created_at.desc()).limit(5).all()
-        recent_comments = Comment.query.order_by(Comment.created_at.desc()).limit(5).all()
-        recent_books = Book.query.order_by(Book.created_at.desc()).limit(5).all()
+        recent_posts = Post.query.options(
+            joinedload(Post.author), joinedload(Post.category)
+        ).order_by(Post.created_at.desc()).limit(5).all()
+        recent_comments = Comment.query.options(
+            joinedload(Comment.post), joinedload(Comment.author)
+        ).order_by(Comment.created_at.desc()).limit(5).all()
+        recent_books = Book.query.options(
+            selectinload(Book.authors)
+        ).order_by(Book.created_at.desc()).limit(5).all()
         recent_messages = ContactMessage.query.order_by(ContactMessage.created_at.desc()).limit(5).all()
         
         # Popular Content (last 30 days)
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        popular_posts = Post.query.filter(
+        popular_posts = Post.query.options(joinedload(Post.author)).filter(
             Post.created_at >= thirty_days_ago
         ).order_by(Post.views.desc()).limit(5).all()
         
-        popular_books = Book.query.filter(
+        popular_books = Book.query.options(selectinload(Book.authors)).filter(
             Book.created_at >= thirty_days_ago
         ).order_by(Book.views.desc()).limit(5).all()
         
         return self.render('admin/dashboard.html',
-                         # Blog stats
-                         total_posts=total_posts,
-                         published_posts=published_posts,
-                         draft_posts=draft_posts,
-                         total_comments=total_comments,
-                         pending_comments=pending_comments,
-                         
-                         # Library stats
-                         total_books=total_books,
-                         total_authors=total_authors,
-                         total_reviews=total_reviews,
-                         pending_reviews=pending_reviews,
-                         
-                         # General stats
-                         total_testimonials=total_testimonials,
-                         pending_testimonials=pending_testimonials,
-                         total_messages=total_messages,
-                         total_subscribers=total_subscribers,
+                         **stats,
                          
                          # Recent activity
                          recent_posts=recent_posts,
@@ -102,6 +265,11 @@ class DashboardView(AdminIndexView):
 # Blog Management Views
 class UserView(SecureModelView):
     column_list = ['username', 'email', 'full_name', 'is_admin', 'is_author', 'is_active', 'post_count', 'created_at']
+    column_counts = {
+        'post_count': lambda ids: db.session.query(Post.author_id, func.count(Post.id)).filter(
+            Post.author_id.in_(ids), Post.published == True
+        ).group_by(Post.author_id)
+    }
     column_searchable_list = ['username', 'email', 'first_name', 'last_name']
     column_filters = ['is_admin', 'is_author', 'is_active', 'created_at']
     form_columns = ['username', 'email', 'first_name', 'last_name', 'bio', 'website', 
@@ -116,8 +284,16 @@ class UserView(SecureModelView):
         'is_active': 'Actif',
         'created_at': 'Créé le'
     }
+    
+    def after_model_change(self, form, model, is_created):
+        model.forget_cached()
+    
+    def after_model_delete(self, model):
+        model.forget_cached()
 
 class PostView(SecureModelView):
+    fast_count = True
+    invalidate_cache_keys = ('blog_categories', 'blog_popular_posts', 'blog_featured_posts')
     column_list = ['title', 'author_id', 'category_id', 'published', 'is_featured', 'views', 'comment_count', 'created_at']
     column_searchable_list = ['title', 'content', 'excerpt']
     column_filters = ['published', 'is_featured', 'is_pinned', 'category_id', 'author_id', 'created_at']
@@ -145,26 +321,31 @@ class PostView(SecureModelView):
         'allow_comments': 'Autoriser commentaires'
     }
     
-    def create_model(self, form):
-        """Override to set published_at when publishing"""
-        model = super().create_model(form)
-        if model and model.published and not model.published_at:
-            model.published_at = datetime.utcnow()
-            db.session.commit()
-        return model
+    def get_query(self):
+        """List pages only load the displayed columns, never the post content"""
+        return super().get_query().options(
+            load_only(Post.id, Post.title, Post.author_id, Post.category_id, Post.published,
+                      Post.is_featured, Post.is_pinned, Post.views, Post.comment_count,
+                      Post.created_at)
+        )
     
-    def update_model(self, form, model):
-        """Override to set published_at when publishing"""
-        result = super().update_model(form, model)
-        if result and model.published and not model.published_at:
+    def on_model_change(self, form, model, is_created):
+        """Set published_at before the model is committed"""
+        if model.published and not model.published_at:
             model.published_at = datetime.utcnow()
-            db.session.commit()
-        elif result and not model.published:
+        elif not model.published:
             model.published_at = None
-            db.session.commit()
-        return result
+    
+    def after_model_change(self, form, model, is_created):
+        super().after_model_change(form, model, is_created)
+        invalidate_stats_cache()
+    
+    def on_model_delete(self, model):
+        """Bulk-delete the post's comments (comments are passive_deletes)"""
+        Comment.query.filter_by(post_id=model.id).delete(synchronize_session=False)
 
 class CommentView(SecureModelView):
+    fast_count = True
     column_list = ['post', 'commenter_name', 'content', 'approved', 'is_spam', 'created_at']
     column_searchable_list = ['content', 'name', 'email']
     column_filters = ['approved', 'is_spam', 'created_at', 'post']
@@ -187,14 +368,25 @@ class CommentView(SecureModelView):
         'parent': 'Réponse à'
     }
     
+    def get_query(self):
+        """commenter_name reads the author: load it with the page, not per row"""
+        return super().get_query().options(joinedload(Comment.author))
+    
     def create_model(self, form):
         """Auto-approve if needed"""
         model = super().create_model(form)
         # You can add auto-approval logic here
+        invalidate_stats_cache()
         return model
 
 class CategoryView(SecureModelView):
+    invalidate_cache_keys = ('blog_categories', 'post_category_choices')
     column_list = ['name', 'post_count', 'is_featured', 'color', 'sort_order', 'created_at']
+    column_counts = {
+        'post_count': lambda ids: db.session.query(Post.category_id, func.count(Post.id)).filter(
+            Post.category_id.in_(ids), Post.published == True
+        ).group_by(Post.category_id)
+    }
     column_searchable_list = ['name', 'description']
     column_filters = ['is_featured', 'created_at']
     column_editable_list = ['sort_order', 'is_featured', 'color']
@@ -217,6 +409,14 @@ class CategoryView(SecureModelView):
 
 class TagView(SecureModelView):
     column_list = ['name', 'post_count', 'book_count', 'color', 'created_at']
+    column_counts = {
+        'post_count': lambda ids: db.session.query(post_tags.c.tag_id, func.count()).filter(
+            post_tags.c.tag_id.in_(ids)
+        ).group_by(post_tags.c.tag_id),
+        'book_count': lambda ids: db.session.query(book_tags.c.tag_id, func.count()).filter(
+            book_tags.c.tag_id.in_(ids)
+        ).group_by(book_tags.c.tag_id)
+    }
     column_searchable_list = ['name', 'description']
     column_filters = ['created_at']
     
@@ -239,41 +439,43 @@ class AnalyticsView(BaseView):
     @expose('/')
     def index(self):
         # Blog Analytics
-        blog_stats = {
-            'total_posts': Post.query.count(),
-            'published_posts': Post.query.filter_by(published=True).count(),
-            'total_views': db.session.query(db.func.sum(Post.views)).scalar() or 0,
-            'total_comments': Comment.query.filter_by(approved=True).count(),
-            'avg_comments_per_post': Comment.query.filter_by(approved=True).count() / max(1, Post.query.filter_by(published=True).count())
-        }
-        
+        blog_stats = _compute_blog_stats()
+        return _conditional_response(blog_stats, lambda: self._render_analytics(blog_stats))
+    
+    def _render_analytics(self, blog_stats):
         # Top performing posts
         top_posts = Post.query.filter_by(published=True).order_by(Post.views.desc()).limit(10).all()
         
-        # Recent activity
-        recent_activity = []
+        # Recent activity: latest posts and comments merged in a single
+        # UNION ALL, with the comment's post title/slug joined in
+        recent_posts = select(
+            literal('post').label('type'),
+            Post.title.label('title'),
+            Post.created_at.label('date'),
+            Post.slug.label('slug')
+        ).order_by(Post.created_at.desc()).limit(5).subquery()
         
-        # Recent posts
-        for post in Post.query.order_by(Post.created_at.desc()).limit(5).all():
-            recent_activity.append({
-                'type': 'post',
-                'title': f'Nouvel article: {post.title}',
-                'date': post.created_at,
-                'url': url_for('blog.post_detail', slug=post.slug)
-            })
+        recent_comments = select(
+            literal('comment').label('type'),
+            Post.title.label('title'),
+            Comment.created_at.label('date'),
+            Post.slug.label('slug')
+        ).join(Comment.post).order_by(Comment.created_at.desc()).limit(5).subquery()
         
-        # Recent comments
-        for comment in Comment.query.order_by(Comment.created_at.desc()).limit(5).all():
-            recent_activity.append({
-                'type': 'comment',
-                'title': f'Nouveau commentaire sur: {comment.post.title}',
-                'date': comment.created_at,
-                'url': url_for('blog.post_detail', slug=comment.post.slug)
-            })
+        activity = union_all(select(recent_posts), select(recent_comments)).subquery()
+        rows = db.session.execute(
+            select(activity).order_by(activity.c.date.desc()).limit(10)
+        ).all()
         
-        # Sort by date
-        recent_activity.sort(key=lambda x: x['date'], reverse=True)
-        recent_activity = recent_activity[:10]
+        # Build the post URL once and fill in each (already URL-safe) slug
+        post_url = url_for('blog.post_detail', slug='__slug__')
+        recent_activity = [{
+            'type': row.type,
+            'title': (f'Nouvel article: {row.title}' if row.type == 'post'
+                      else f'Nouveau commentaire sur: {row.title}'),
+            'date': row.date,
+            'url': post_url.replace('__slug__', row.slug)
+        } for row in rows]
         
         return self.render('admin/analytics.html',
                          blog_stats=blog_stats,
@@ -291,12 +493,17 @@ class ContentToolsView(BaseView):
         """Bulk publish selected posts"""
         post_ids = request.form.getlist('post_ids')
         if post_ids:
-            posts = Post.query.filter(Post.id.in_(post_ids)).all()
-            for post in posts:
-                if not post.published:
-                    post.publish()
+            updated = Post.query.filter(
+                Post.id.in_(post_ids),
+                Post.published == False
+            ).update({
+                Post.published: True,
+                Post.published_at: datetime.utcnow()
+            }, synchronize_session=False)
             db.session.commit()
-            flash(f'{len(posts)} articles publiés avec succès!', 'success')
+            invalidate_stats_cache()
+            cache.delete_many(*PostView.invalidate_cache_keys)
+            flash(f'{updated} articles publiés avec succès!', 'success')
         return redirect(url_for('.index'))
     
     @expose('/bulk-unpublish', methods=['POST'])
@@ -304,17 +511,28 @@ class ContentToolsView(BaseView):
         """Bulk unpublish selected posts"""
         post_ids = request.form.getlist('post_ids')
         if post_ids:
-            posts = Post.query.filter(Post.id.in_(post_ids)).all()
-            for post in posts:
-                if post.published:
-                    post.unpublish()
+            updated = Post.query.filter(
+                Post.id.in_(post_ids),
+                Post.published == True
+            ).update({
+                Post.published: False,
+                Post.published_at: None
+            }, synchronize_session=False)
             db.session.commit()
-            flash(f'{len(posts)} articles dépubliés avec succès!', 'success')
+            invalidate_stats_cache()
+            cache.delete_many(*PostView.invalidate_cache_keys)
+            flash(f'{updated} articles dépubliés avec succès!', 'success')
         return redirect(url_for('.index'))
 
 # Library Admin Views (from previous implementation)
 class AuthorView(SecureModelView):
     column_list = ['name', 'nationality', 'book_count', 'profile_views', 'created_at']
+    column_counts = {
+        'book_count': lambda ids: db.session.query(book_authors.c.author_id, func.count()).filter(
+            book_authors.c.author_id.in_(ids)
+        ).group_by(book_authors.c.author_id)
+    }
+    invalidate_cache_keys = ('book_form_choices',)
     column_searchable_list = ['name', 'nationality']
     column_filters = ['nationality', 'created_at']
     form_columns = ['name', 'photo', 'nationality', 'birth_date', 'death_date', 
@@ -326,6 +544,12 @@ class AuthorView(SecureModelView):
 
 class PublisherView(SecureModelView):
     column_list = ['name', 'website', 'book_count', 'is_active', 'created_at']
+    column_counts = {
+        'book_count': lambda ids: db.session.query(Book.publisher_id, func.count(Book.id)).filter(
+            Book.publisher_id.in_(ids)
+        ).group_by(Book.publisher_id)
+    }
+    invalidate_cache_keys = ('book_form_choices',)
     column_searchable_list = ['name', 'email']
     column_filters = ['is_active', 'founded_year']
     form_overrides = {
@@ -334,6 +558,12 @@ class PublisherView(SecureModelView):
 
 class BookCategoryView(SecureModelView):
     column_list = ['name', 'book_count', 'sort_order', 'created_at']
+    column_counts = {
+        'book_count': lambda ids: db.session.query(Book.book_category_id, func.count(Book.id)).filter(
+            Book.book_category_id.in_(ids)
+        ).group_by(Book.book_category_id)
+    }
+    invalidate_cache_keys = ('book_form_choices',)
     column_searchable_list = ['name']
     column_editable_list = ['sort_order']
     form_overrides = {
@@ -343,6 +573,11 @@ class BookCategoryView(SecureModelView):
 class BookView(SecureModelView):
     column_list = ['title', 'author_names', 'book_category', 'publisher', 
                   'is_published', 'is_featured', 'views', 'created_at']
+    # Relationships are eager-loaded explicitly in get_query
+    column_auto_select_related = False
+    # Same keys as invalidate_admin_cache in app/admin_panel/routes.py, plus the form choices
+    invalidate_cache_keys = ('admin_dashboard', 'admin_featured_books', 'admin_all_books',
+                             'admin_count_books', 'book_form_choices')
     column_searchable_list = ['title', 'isbn_13', 'keywords']
     column_filters = ['is_published', 'is_featured', 'is_bestseller', 
                      'is_new_release', 'book_category', 'publisher', 'authors']
@@ -367,8 +602,22 @@ class BookView(SecureModelView):
                        ('pre_order', 'Pre-order')]
         }
     }
+    
+    def get_query(self):
+        """List pages only show short columns: skip the long text fields and
+        load author_names in one IN query"""
+        return super().get_query().options(
+            joinedload(Book.book_category),
+            joinedload(Book.publisher),
+            defer(Book.description),
+            defer(Book.abstract),
+            defer(Book.excerpt),
+            defer(Book.table_of_contents),
+            selectinload(Book.authors)
+        )
 
 class BookReviewView(SecureModelView):
+    fast_count = True
     column_list = ['book', 'reviewer_name', 'rating', 'is_approved', 
                   'is_featured', 'created_at']
     column_searchable_list = ['reviewer_name', 'reviewer_email', 'content']
@@ -412,6 +661,7 @@ class ContactMessageView(SecureModelView):
     }
 
 class NewsletterSubscriberView(SecureModelView):
+    fast_count = True
     column_list = ['email', 'name', 'subscribed', 'confirmed', 'source', 'created_at']
     column_searchable_list = ['email', 'name']
     column_filters = ['subscribed', 'confirmed', 'source', 'created_at']
@@ -1,26 +1,38 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify, current_app
+from flask import render_template, redirect, url_for, flash, request, jsonify, current_app, abort, Response, stream_with_context
 from flask_login import login_required, current_user
 from functools import wraps
 from app.admin_panel import bp
-from app.extensions import db, mail
+from app.extensions import db, mail, cache, limiter
+from app.pagination import keyset_paginate
+from app.main.routes import is_valid_email
 from app.models import (
     User, Post, Comment, Category, Collection, Tag, ContactMessage, 
     NewsletterSubscriber, Author, Publisher, BookCategory, Book, 
     BookReview, Testimonial, LibraryStats, PresidentMessage, CommunicationCompany,
-    AdminInviteToken, AdminActionLog
+    AdminInviteToken, AdminActionLog, book_authors, book_tags, book_collections,
+    estimated_count
 )
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import os
 import uuid
+import csv
+import io
 from werkzeug.utils import secure_filename
 from PIL import Image
 from flask_mail import Message
+from sqlalchemy import select, func, case, or_, delete, update, insert
+from sqlalchemy.orm import joinedload, selectinload, aliased
 
 
 def admin_required(f):
+    """Login and admin check in a single wrapper (implies @login_required)"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_admin:
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        if not user.is_admin:
             flash('Accès refusé. Vous devez être administrateur.', 'danger')
             return redirect(url_for('main.index'))
         return f(*args, **kwargs)
@@ -28,9 +40,13 @@ def admin_required(f):
 
 
 def general_manager_required(f):
+    """Login and General Manager check in a single wrapper (implies @login_required)"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or not current_user.is_general_manager:
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        if not user.is_general_manager:
             flash('Accès refusé. Vous devez être General Manager.', 'danger')
             return redirect(url_for('main.index'))
         return f(*args, **kwargs)
@@ -38,9 +54,13 @@ def general_manager_required(f):
 
 
 def manager_required(f):
+    """Login and Manager check in a single wrapper (implies @login_required)"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or not (current_user.is_manager or current_user.is_general_manager):
+        user = current_user._get_current_object()
+        if not user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        if not (user.is_manager or user.is_general_manager):
             flash('Accès refusé. Vous devez être Manager ou General Manager.', 'danger')
             return redirect(url_for('main.index'))
         return f(*args, **kwargs)
@@ -53,6 +73,60 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
 
+def _parse_date(value):
+    """Date from a YYYY-MM-DD form field, None when empty"""
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+# Uploads are copied to disk in chunks of this size
+UPLOAD_BUFFER_SIZE = 64 * 1024
+
+# Background worker for outgoing mail, so SMTP never blocks a request
+_mail_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def _send_mail(app, msg):
+    with app.app_context():
+        try:
+            mail.send(msg)
+        except Exception:
+            app.logger.exception('Could not send "%s" to %s', msg.subject, ', '.join(msg.recipients))
+
+
+def send_email_async(msg):
+    """Send a Flask-Mail message from the background mail worker"""
+    _mail_executor.submit(_send_mail, current_app._get_current_object(), msg)
+
+
+def resize_image(stream, file_path, max_width=1200):
+    """Decode an upload from stream and write it to file_path shrunk to max_width.
+    Returns False, without writing anything, when the image is already narrow enough."""
+    with Image.open(stream) as img:
+        if img.width <= max_width:
+            return False
+        image_format = img.format
+        ratio = max_width / img.width
+        new_height = int(img.height * ratio)
+        if image_format == 'JPEG':
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the
+            # target size) so LANCZOS starts from a much smaller image
+            img.draft(img.mode, (max_width, new_height))
+        img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+    img.save(file_path, format=image_format, optimize=True, quality=85)
+    return True
+
+
+# Upload directories already created by this process
+_created_dirs = set()
+
+
+def ensure_dir(path):
+    """os.makedirs once per directory and process, not on every upload"""
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+
+
 def save_image(file, folder_name):
     """Save uploaded image file and return the relative path"""
     if file and allowed_file(file.filename):
@@ -63,24 +137,22 @@ def save_image(file, folder_name):
         
         # Create upload directory if it doesn't exist
         upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], folder_name)
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Save the file
+        ensure_dir(upload_dir)
         file_path = os.path.join(upload_dir, unique_filename)
-        file.save(file_path)
         
-        # Resize image if it's too large (optional optimization)
-        try:
-            if ext.lower() in ['.jpg', '.jpeg', '.png']:
-                with Image.open(file_path) as img:
-                    # Resize if larger than 1200px width
-                    if img.width > 1200:
-                        ratio = 1200 / img.width
-                        new_height = int(img.height * ratio)
-                        img = img.resize((1200, new_height), Image.Resampling.LANCZOS)
-                        img.save(file_path, optimize=True, quality=85)
-        except Exception as e:
-            print(f"Error resizing image: {e}")
+        # Images wider than 1200px are resized straight from the upload stream,
+        # so the file is written once
+        resized = False
+        if ext.lower() in ['.jpg', '.jpeg', '.png']:
+            try:
+                resized = resize_image(file.stream, file_path)
+            except Exception:
+                current_app.logger.exception('Could not resize %s', file_path)
+            file.stream.seek(0)
+        
+        # Other files are saved as uploaded (streamed in fixed-size chunks)
+        if not resized:
+            file.save(file_path, buffer_size=UPLOAD_BUFFER_SIZE)
         
         # Return relative path for database storage
         return f"/static/uploads/{folder_name}/{unique_filename}"
@@ -101,25 +173,82 @@ def delete_image(image_path):
             print(f"Error deleting image: {e}")
 
 
+def invalidate_admin_cache():
+    """Drop cached dashboard figures and featured-book lists after book changes"""
+    cache.delete_many('admin_dashboard', 'admin_featured_books', 'admin_all_books', 'admin_count_books')
+
+
+def invalidate_blog_cache():
+    """Drop the cached blog sidebar (category counts, popular and featured posts) after post changes"""
+    cache.delete_many('blog_categories', 'blog_popular_posts', 'blog_featured_posts')
+
+
+def book_form_choices():
+    """(id, name) rows for the book form dropdowns, cached for 5 minutes"""
+    choices = cache.get('book_form_choices')
+    if choices is None:
+        choices = {
+            'authors': Author.query.with_entities(Author.id, Author.name).order_by(Author.name).all(),
+            'publishers': Publisher.query.with_entities(Publisher.id, Publisher.name).order_by(Publisher.name).all(),
+            'categories': BookCategory.query.with_entities(BookCategory.id, BookCategory.name).order_by(BookCategory.name).all(),
+            'collections': Collection.query.with_entities(Collection.id, Collection.name).order_by(Collection.name).all()
+        }
+        cache.set('book_form_choices', choices, timeout=300)
+    return choices
+
+
+def post_category_choices():
+    """(id, name) rows for the post form category dropdown, cached for 60 seconds"""
+    choices = cache.get('post_category_choices')
+    if choices is None:
+        choices = Category.query.with_entities(Category.id, Category.name).order_by(Category.name).all()
+        cache.set('post_category_choices', choices, timeout=60)
+    return choices
+
+
+def cached_books(key, query):
+    """Display rows (plain dicts, not ORM instances) of a book listing, cached
+    for 60 seconds, so a stale entry can never be merged back into the session"""
+    books = cache.get(key)
+    if books is None:
+        books = [{
+            'id': book.id,
+            'title': book.title,
+            'cover_image': book.cover_image,
+            'author_names': book.author_names,
+            'is_featured': book.is_featured,
+            'category_name': book.book_category.name if book.book_category else None
+        } for book in query]
+        cache.set(key, books, timeout=60)
+    return books
+
+
+def paginate_cached(query, key, page, per_page=20, total=None):
+    """Paginate without a COUNT(*) per request; the total is cached for 30 seconds"""
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    if total is None and page == 1 and len(pagination.items) < per_page:
+        # A short first page is the whole result set
+        total = len(pagination.items)
+    if total is None:
+        total = cache.get(key)
+        if total is None:
+            total = query.order_by(None).count()
+            cache.set(key, total, timeout=30)
+    pagination.total = total
+    return pagination
+
+
 @bp.route('/')
-@login_required
 @admin_required
 def dashboard():
-    # Calculate statistics
-    stats = {
-        'total_books': Book.query.count(),
-        'total_authors': Author.query.count(),
-        'total_posts': Post.query.count(),
-        'total_collections': Collection.query.count(),
-        'total_users': User.query.count(),
-        'total_testimonials': Testimonial.query.count(),
-        'pending_testimonials': Testimonial.query.filter_by(is_active=False).count(),
-        'contact_messages': ContactMessage.query.count(),
-        'newsletter_subscribers': NewsletterSubscriber.query.count()
-    }
+    # Calculate statistics (cached for a minute)
+    stats = cache.get('admin_dashboard')
+    if stats is None:
+        stats = _dashboard_stats()
+        cache.set('admin_dashboard', stats, timeout=60)
     
     # Recent activity
-    recent_books = Book.query.order_by(Book.created_at.desc()).limit(5).all()
+    recent_books = Book.query.options(selectinload(Book.authors)).order_by(Book.created_at.desc()).limit(5).all()
     recent_posts = Post.query.order_by(Post.created_at.desc()).limit(5).all()
     recent_comments = Comment.query.order_by(Comment.created_at.desc()).limit(5).all()
     pending_testimonials = Testimonial.query.filter_by(is_active=False).order_by(Testimonial.created_at.desc()).limit(5).all()
@@ -132,21 +261,39 @@ def dashboard():
                          pending_testimonials=pending_testimonials)
 
 
+def _dashboard_stats():
+    """Dashboard counts in one round-trip, one scalar subquery per table"""
+    def count_of(model):
+        return select(func.count(model.id)).scalar_subquery()
+    
+    return db.session.execute(select(
+        count_of(Book).label('total_books'),
+        count_of(Author).label('total_authors'),
+        count_of(Post).label('total_posts'),
+        count_of(Collection).label('total_collections'),
+        count_of(User).label('total_users'),
+        count_of(Testimonial).label('total_testimonials'),
+        select(
+            func.count(case((Testimonial.is_active.is_(False), 1)))
+        ).scalar_subquery().label('pending_testimonials'),
+        count_of(ContactMessage).label('contact_messages'),
+        count_of(NewsletterSubscriber).label('newsletter_subscribers')
+    )).one()._asdict()
+
+
 # Books Management
 @bp.route('/books')
-@login_required
 @admin_required
 def books():
     page = request.args.get('page', 1, type=int)
-    books = Book.query.order_by(Book.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    query = Book.query.options(
+        selectinload(Book.authors), joinedload(Book.publisher)
+    ).order_by(Book.created_at.desc())
+    books = paginate_cached(query, 'admin_count_books', page)
     return render_template('admin_panel/books.html', books=books)
 
 
 @bp.route('/books/new', methods=['GET', 'POST'])
-@bp.route('/books/new', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def new_book():
     if request.method == 'POST':
@@ -197,20 +344,15 @@ def new_book():
             if publication_date:
                 book.publication_date = datetime.strptime(publication_date, '%Y-%m-%d').date()
             
-            # Add authors
-            for author_id in author_ids:
-                author = Author.query.get(author_id)
-                if author:
-                    book.authors.append(author)
-            
-            # Add to collections
-            for collection_id in collection_ids:
-                collection = Collection.query.get(collection_id)
-                if collection:
-                    book.collections.append(collection)
+            # Add authors and collections (one query each)
+            if author_ids:
+                book.authors = Author.query.filter(Author.id.in_(author_ids)).all()
+            if collection_ids:
+                book.collections = Collection.query.filter(Collection.id.in_(collection_ids)).all()
             
             db.session.add(book)
             db.session.commit()
+            invalidate_admin_cache()
             
             flash(f'Livre "{title}" créé avec succès!', 'success')
             return redirect(url_for('admin_panel.books'))
@@ -219,21 +361,10 @@ def new_book():
             db.session.rollback()
            
     
-    # Get form data
-    authors = Author.query.order_by(Author.name).all()
-    publishers = Publisher.query.order_by(Publisher.name).all()
-    categories = BookCategory.query.order_by(BookCategory.name).all()
-    collections = Collection.query.order_by(Collection.name).all()
-    
-    return render_template('admin_panel/book_form.html',
-                         authors=authors,
-                         publishers=publishers,
-                         categories=categories,
-                         collections=collections)
+    return render_template('admin_panel/book_form.html', **book_form_choices())
 
 
 @bp.route('/books/<int:id>/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_book(id):
     book = Book.query.get_or_404(id)
@@ -267,21 +398,14 @@ def edit_book(id):
                 # Save new image
                 book.cover_image = save_image(cover_image_file, 'books')
         
-        # Update authors
+        # Update authors and collections (one query each; assignment replaces
+        # the old associations). No autoflush: the edited book is written once,
+        # at commit, rather than before each of these SELECTs.
         author_ids = request.form.getlist('author_ids', type=int)
-        book.authors.clear()
-        for author_id in author_ids:
-            author = Author.query.get(author_id)
-            if author:
-                book.authors.append(author)
-        
-        # Update collections
         collection_ids = request.form.getlist('collection_ids', type=int)
-        book.collections.clear()
-        for collection_id in collection_ids:
-            collection = Collection.query.get(collection_id)
-            if collection:
-                book.collections.append(collection)
+        with db.session.no_autoflush:
+            book.authors = Author.query.filter(Author.id.in_(author_ids)).all() if author_ids else []
+            book.collections = Collection.query.filter(Collection.id.in_(collection_ids)).all() if collection_ids else []
         
         # Handle status flags
         book.is_featured = bool(request.form.get('is_featured'))
@@ -290,38 +414,34 @@ def edit_book(id):
         book.is_new_release = bool(request.form.get('is_new_release'))
         
         try:
-            book.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_admin_cache()
             flash(f'Livre "{book.title}" mis à jour avec succès!', 'success')
             return redirect(url_for('admin_panel.books'))
         except Exception as e:
             db.session.rollback()
             flash(f'Erreur lors de la mise à jour: {str(e)}', 'danger')
     
-    # Get form data
-    authors = Author.query.order_by(Author.name).all()
-    publishers = Publisher.query.order_by(Publisher.name).all()
-    categories = BookCategory.query.order_by(BookCategory.name).all()
-    collections = Collection.query.order_by(Collection.name).all()
-    
-    return render_template('admin_panel/book_form.html',
-                         book=book,
-                         authors=authors,
-                         publishers=publishers,
-                         categories=categories,
-                         collections=collections)
+    return render_template('admin_panel/book_form.html', book=book, **book_form_choices())
 
 
 @bp.route('/books/<int:id>/delete', methods=['POST'])
-@login_required
+@limiter.limit('10 per minute')
 @admin_required
 def delete_book(id):
-    book = Book.query.get_or_404(id)
-    title = book.title
+    title = db.session.execute(select(Book.title).where(Book.id == id)).scalar()
+    if title is None:
+        abort(404)
     
     try:
-        db.session.delete(book)
+        # Set-based deletes: nothing is loaded just to be removed
+        for association in (book_authors, book_tags, book_collections):
+            db.session.execute(association.delete().where(association.c.book_id == id))
+        db.session.execute(delete(BookReview).where(BookReview.book_id == id))
+        db.session.execute(update(Testimonial).where(Testimonial.book_id == id).values(book_id=None))
+        db.session.execute(delete(Book).where(Book.id == id))
         db.session.commit()
+        invalidate_admin_cache()
         flash(f'Livre "{title}" supprimé avec succès!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -331,18 +451,19 @@ def delete_book(id):
 
 
 @bp.route('/featured-books')
-@login_required
 @admin_required
 def featured_books():
     """Manage featured books for homepage carousel"""
-    featured_books = Book.query.filter_by(
+    # Both lists show author names and the category
+    eager = (selectinload(Book.authors), joinedload(Book.book_category))
+    featured_books = cached_books('admin_featured_books', Book.query.options(*eager).filter_by(
         is_published=True,
         is_featured=True
-    ).order_by(Book.created_at.desc()).all()
+    ).order_by(Book.created_at.desc()))
     
-    all_books = Book.query.filter_by(
+    all_books = cached_books('admin_all_books', Book.query.options(*eager).filter_by(
         is_published=True
-    ).order_by(Book.title).all()
+    ).order_by(Book.title))
     
     return render_template('admin_panel/featured_books.html',
                          featured_books=featured_books,
@@ -350,7 +471,6 @@ def featured_books():
 
 
 @bp.route('/featured-books/update', methods=['POST'])
-@login_required
 @admin_required
 def update_featured_books():
     """Update featured books selection"""
@@ -360,15 +480,14 @@ def update_featured_books():
         if len(featured_book_ids) > 12:
             flash('Vous ne pouvez sélectionner que 12 livres vedettes au maximum.', 'danger')
             return redirect(url_for('admin_panel.featured_books'))
-        # Remove featured status from all books
-        Book.query.filter_by(is_featured=True).update({Book.is_featured: False})
-        # Set featured status for selected books
-        if featured_book_ids:
-            Book.query.filter(Book.id.in_(featured_book_ids)).update(
-                {Book.is_featured: True}, 
-                synchronize_session=False
-            )
+        # Feature the selected books and un-feature the others in one UPDATE
+        selected = Book.id.in_(featured_book_ids)
+        Book.query.filter(or_(Book.is_featured == True, selected)).update(
+            {Book.is_featured: case((selected, True), else_=False)},
+            synchronize_session=False
+        )
         db.session.commit()
+        invalidate_admin_cache()
         flash(f'{len(featured_book_ids)} livres sélectionnés comme vedettes!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -378,18 +497,14 @@ def update_featured_books():
 
 # Authors Management
 @bp.route('/authors')
-@login_required
 @admin_required
 def authors():
     page = request.args.get('page', 1, type=int)
-    authors = Author.query.order_by(Author.name).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    authors = paginate_cached(Author.query.order_by(Author.name), 'admin_count_authors', page)
     return render_template('admin_panel/authors.html', authors=authors)
 
 
 @bp.route('/authors/new', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def new_author():
     if request.method == 'POST':
@@ -419,6 +534,7 @@ def new_author():
             
             db.session.add(author)
             db.session.commit()
+            cache.delete('book_form_choices')
             
             flash(f'Auteur "{name}" créé avec succès!', 'success')
             return redirect(url_for('admin_panel.authors'))
@@ -432,7 +548,6 @@ def new_author():
 
 # Collections Management
 @bp.route('/collections')
-@login_required
 @admin_required
 def collections():
     collections = Collection.query.order_by(Collection.name).all()
@@ -440,7 +555,6 @@ def collections():
 
 
 @bp.route('/collections/new', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def new_collection():
     if request.method == 'POST':
@@ -470,6 +584,7 @@ def new_collection():
             
             db.session.add(collection)
             db.session.commit()
+            cache.delete('book_form_choices')
             
             flash(f'Collection "{name}" créée avec succès!', 'success')
             return redirect(url_for('admin_panel.collections'))
@@ -483,18 +598,15 @@ def new_collection():
 
 # Users Management  
 @bp.route('/users')
-@login_required
 @admin_required
 def users():
     page = request.args.get('page', 1, type=int)
-    users = User.query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    users = paginate_cached(User.query.order_by(User.created_at.desc()), 'admin_count_users', page)
     return render_template('admin_panel/users.html', users=users)
 
 
 @bp.route('/users/<int:id>/toggle_admin', methods=['POST'])
-@login_required
+@limiter.limit('10 per minute')
 @admin_required
 def toggle_admin(id):
     user = User.query.get_or_404(id)
@@ -503,8 +615,7 @@ def toggle_admin(id):
         return redirect(url_for('admin_panel.users'))
     old_status = user.is_admin
     user.is_admin = not user.is_admin
-    db.session.commit()
-    # Audit log
+    # Audit log, committed in the same transaction as the change
     action = 'promote_to_admin' if user.is_admin else 'demote_admin'
     log = AdminActionLog(
         action=action,
@@ -514,13 +625,14 @@ def toggle_admin(id):
     )
     db.session.add(log)
     db.session.commit()
+    user.forget_cached()
     status = "accordé" if user.is_admin else "retiré"
     flash(f'Privilège administrateur {status} pour {user.full_name}.', 'success')
     return redirect(url_for('admin_panel.users'))
 
 
 @bp.route('/users/<int:id>/toggle_manager', methods=['POST'])
-@login_required
+@limiter.limit('10 per minute')
 @admin_required
 def toggle_manager(id):
     user = User.query.get_or_404(id)
@@ -529,8 +641,7 @@ def toggle_manager(id):
         return redirect(url_for('admin_panel.users'))
     old_status = user.is_manager
     user.is_manager = not user.is_manager
-    db.session.commit()
-    # Audit log
+    # Audit log, committed in the same transaction as the change
     action = 'promote_to_manager' if user.is_manager else 'demote_manager'
     log = AdminActionLog(
         action=action,
@@ -540,13 +651,14 @@ def toggle_manager(id):
     )
     db.session.add(log)
     db.session.commit()
+    user.forget_cached()
     status = "accordé" if user.is_manager else "retiré"
     flash(f'Privilège manager {status} pour {user.full_name}.', 'success')
     return redirect(url_for('admin_panel.users'))
 
 
 @bp.route('/users/<int:id>/toggle_general_manager', methods=['POST'])
-@login_required
+@limiter.limit('10 per minute')
 @general_manager_required
 def toggle_general_manager(id):
     user = User.query.get_or_404(id)
@@ -555,8 +667,7 @@ def toggle_general_manager(id):
         return redirect(url_for('admin_panel.users'))
     old_status = user.is_general_manager
     user.is_general_manager = not user.is_general_manager
-    db.session.commit()
-    # Audit log
+    # Audit log, committed in the same transaction as the change
     action = 'promote_to_general_manager' if user.is_general_manager else 'demote_general_manager'
     log = AdminActionLog(
         action=action,
@@ -566,12 +677,14 @@ def toggle_general_manager(id):
     )
     db.session.add(log)
     db.session.commit()
+    user.forget_cached()
     status = "accordé" if user.is_general_manager else "retiré"
     flash(f'Privilège General Manager {status} pour {user.full_name}.', 'success')
     return redirect(url_for('admin_panel.users'))
 
 
 @bp.route('/promote-user-to-admin', methods=['POST'])
+@limiter.limit('10 per minute')
 @login_required
 def promote_user_to_admin():
     if not current_user.is_general_manager:
@@ -592,8 +705,7 @@ def promote_user_to_admin():
         flash("Cet utilisateur est déjà administrateur.", "info")
         return redirect(url_for('admin_panel.dashboard'))
     user.is_admin = True
-    db.session.commit()
-    # Audit log
+    # Audit log, committed in the same transaction as the change
     log = AdminActionLog(
         action='promote_to_admin',
         performed_by_id=current_user.id,
@@ -602,13 +714,13 @@ def promote_user_to_admin():
     )
     db.session.add(log)
     db.session.commit()
+    user.forget_cached()
     flash(f"{user.full_name or user.email} est maintenant administrateur!", "success")
     return redirect(url_for('admin_panel.dashboard'))
 
 
 # Testimonials Management
 @bp.route('/testimonials')
-@login_required
 @admin_required
 def testimonials():
     page = request.args.get('page', 1, type=int)
@@ -622,14 +734,17 @@ def testimonials():
     else:
         query = Testimonial.query
     
-    testimonials = query.order_by(Testimonial.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    # Calculate counts for template (one GROUP BY instead of three COUNTs)
+    counts = dict(db.session.execute(
+        select(Testimonial.is_active, func.count(Testimonial.id)).group_by(Testimonial.is_active)
+    ).all())
+    all_count = sum(counts.values())
+    pending_count = counts.get(False, 0)
+    approved_count = counts.get(True, 0)
     
-    # Calculate counts for template
-    all_count = Testimonial.query.count()
-    pending_count = Testimonial.query.filter_by(is_active=False).count()
-    approved_count = Testimonial.query.filter_by(is_active=True).count()
+    # The GROUP BY already gives the total, so skip the paginator's COUNT(*)
+    total = {'pending': pending_count, 'approved': approved_count}.get(status, all_count)
+    testimonials = paginate_cached(query.order_by(Testimonial.created_at.desc()), None, page, total=total)
     
     return render_template('admin_panel/testimonials.html', 
                          testimonials=testimonials,
@@ -640,7 +755,6 @@ def testimonials():
 
 
 @bp.route('/testimonials/<int:id>/approve', methods=['POST'])
-@login_required
 @admin_required
 def approve_testimonial(id):
     testimonial = Testimonial.query.get_or_404(id)
@@ -653,7 +767,6 @@ def approve_testimonial(id):
 
 
 @bp.route('/testimonials/<int:id>/reject', methods=['POST'])
-@login_required
 @admin_required
 def reject_testimonial(id):
     testimonial = Testimonial.query.get_or_404(id)
@@ -665,11 +778,10 @@ def reject_testimonial(id):
 
 
 @bp.route('/testimonials/<int:id>/delete', methods=['POST'])
-@login_required
 @admin_required
 def delete_testimonial(id):
-    testimonial = Testimonial.query.get_or_404(id)
-    db.session.delete(testimonial)
+    if not db.session.execute(delete(Testimonial).where(Testimonial.id == id)).rowcount:
+        abort(404)
     db.session.commit()
     
     flash('Témoignage supprimé avec succès!', 'success')
@@ -677,7 +789,6 @@ def delete_testimonial(id):
 
 
 @bp.route('/collections/<int:id>/delete', methods=['POST'])
-@login_required
 @admin_required
 def delete_collection(id):
     collection = Collection.query.get_or_404(id)
@@ -690,13 +801,13 @@ def delete_collection(id):
     
     db.session.delete(collection)
     db.session.commit()
+    cache.delete('book_form_choices')
     
     flash(f'Collection "{collection_name}" supprimée avec succès!', 'success')
     return redirect(url_for('admin_panel.collections'))
 
 
 @bp.route('/authors/<int:id>/delete', methods=['POST'])
-@login_required
 @admin_required
 def delete_author(id):
     author = Author.query.get_or_404(id)
@@ -709,13 +820,13 @@ def delete_author(id):
     
     db.session.delete(author)
     db.session.commit()
+    cache.delete('book_form_choices')
     
     flash(f'Auteur "{author_name}" supprimé avec succès!', 'success')
     return redirect(url_for('admin_panel.authors'))
 
 
 @bp.route('/collections/<int:id>/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_collection(id):
     collection = Collection.query.get_or_404(id)
@@ -736,6 +847,7 @@ def edit_collection(id):
                 collection.image = save_image(image_file, 'collections')
         
         db.session.commit()
+        cache.delete('book_form_choices')
         flash(f'Collection "{collection.name}" mise à jour avec succès!', 'success')
         return redirect(url_for('admin_panel.collections'))
     
@@ -743,7 +855,6 @@ def edit_collection(id):
 
 
 @bp.route('/authors/<int:id>/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_author(id):
     author = Author.query.get_or_404(id)
@@ -764,6 +875,7 @@ def edit_author(id):
             author.death_date = datetime.strptime(death_date, '%Y-%m-%d').date()
         
         db.session.commit()
+        cache.delete('book_form_choices')
         flash(f'Auteur "{author.name}" mis à jour avec succès!', 'success')
         return redirect(url_for('admin_panel.authors'))
     
@@ -772,7 +884,6 @@ def edit_author(id):
 
 # Blog Management
 @bp.route('/posts')
-@login_required
 @admin_required
 def posts():
     """List all blog posts"""
@@ -786,16 +897,11 @@ def posts():
     elif status == 'draft':
         query = query.filter_by(published=False)
     
-    posts = query.order_by(Post.created_at.desc()).paginate(
-        page=page,
-        per_page=20,
-        error_out=False
-    )
+    posts = paginate_cached(query.order_by(Post.created_at.desc()), f'admin_count_posts_{status}', page)
     
     return render_template('admin_panel/posts.html', posts=posts, current_status=status)
 
 @bp.route('/posts/new', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def new_post():
     """Create a new blog post"""
@@ -832,6 +938,7 @@ def new_post():
             
             db.session.add(post)
             db.session.commit()
+            invalidate_blog_cache()
             
             flash(f'Article "{title}" créé avec succès!', 'success')
             return redirect(url_for('admin_panel.posts'))
@@ -841,13 +948,12 @@ def new_post():
             flash(f'Erreur lors de la création de l\'article: {str(e)}', 'danger')
     
     # Get categories for form
-    categories = Category.query.order_by(Category.name).all()
+    categories = post_category_choices()
     
     return render_template('admin_panel/post_form.html', 
                          categories=categories)
 
 @bp.route('/posts/<int:id>/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_post(id):
     """Edit a blog post"""
@@ -877,8 +983,8 @@ def edit_post(id):
             post.published_at = datetime.utcnow()
         
         try:
-            post.updated_at = datetime.utcnow()
             db.session.commit()
+            invalidate_blog_cache()
             flash(f'Article "{post.title}" mis à jour avec succès!', 'success')
             return redirect(url_for('admin_panel.posts'))
         except Exception as e:
@@ -886,14 +992,13 @@ def edit_post(id):
             flash(f'Erreur lors de la mise à jour: {str(e)}', 'danger')
     
     # Get categories for form
-    categories = Category.query.order_by(Category.name).all()
+    categories = post_category_choices()
     
     return render_template('admin_panel/post_form.html',
                          post=post,
                          categories=categories)
 
 @bp.route('/posts/<int:id>/delete', methods=['POST'])
-@login_required
 @admin_required
 def delete_post(id):
     """Delete a blog post"""
@@ -904,11 +1009,13 @@ def delete_post(id):
         if post.featured_image:
             delete_image(post.featured_image)
         
-        # Delete associated comments
-        Comment.query.filter_by(post_id=id).delete()
+        # Delete associated comments in one statement (also covers databases
+        # created before the ON DELETE CASCADE foreign key)
+        Comment.query.filter_by(post_id=id).delete(synchronize_session=False)
         
         db.session.delete(post)
         db.session.commit()
+        invalidate_blog_cache()
         flash(f'Article "{post.title}" supprimé avec succès!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -917,11 +1024,9 @@ def delete_post(id):
     return redirect(url_for('admin_panel.posts'))
 
 @bp.route('/comments')
-@login_required
 @admin_required
 def comments():
     """Manage blog comments"""
-    page = request.args.get('page', 1, type=int)
     status = request.args.get('status', 'all')
     
     # Filter comments based on status
@@ -933,18 +1038,20 @@ def comments():
     elif status == 'spam':
         query = query.filter_by(is_spam=True)
     
-    comments = query.order_by(Comment.created_at.desc()).paginate(
-        page=page,
-        per_page=20,
-        error_out=False
-    )
+    comments = keyset_paginate(query.order_by(Comment.created_at.desc(), Comment.id.desc()))
+    pending_count = 0
+    if status == 'pending':
+        pending_count = cache.get('admin_count_comments_pending')
+        if pending_count is None:
+            pending_count = query.order_by(None).count()
+            cache.set('admin_count_comments_pending', pending_count, timeout=30)
     
     return render_template('admin_panel/comments.html', 
                          comments=comments, 
+                         pending_count=pending_count,
                          current_status=status)
 
 @bp.route('/comments/<int:id>/approve', methods=['POST'])
-@login_required
 @admin_required
 def approve_comment(id):
     """Approve a comment"""
@@ -957,7 +1064,6 @@ def approve_comment(id):
     return redirect(url_for('admin_panel.comments'))
 
 @bp.route('/comments/<int:id>/reject', methods=['POST'])
-@login_required
 @admin_required
 def reject_comment(id):
     """Reject a comment (mark as spam)"""
@@ -970,7 +1076,6 @@ def reject_comment(id):
     return redirect(url_for('admin_panel.comments'))
 
 @bp.route('/comments/<int:id>/delete', methods=['POST'])
-@login_required
 @admin_required
 def delete_comment(id):
     """Delete a comment"""
@@ -986,8 +1091,102 @@ def delete_comment(id):
     
     return redirect(url_for('admin_panel.comments'))
 
+@bp.route('/comments/bulk', methods=['POST'])
+@admin_required
+def bulk_comments():
+    """Approve, reject or delete the selected comments in one statement"""
+    ids = request.form.getlist('ids', type=int)
+    action = request.form.get('action')
+    status = request.form.get('status', 'all')
+    if not ids or action not in ('approve', 'reject', 'delete'):
+        flash('Sélectionnez des commentaires et une action.', 'warning')
+        return redirect(url_for('admin_panel.comments', status=status))
+    
+    try:
+        # Bulk statements skip the Comment events, so counters are recomputed below
+        post_ids = db.session.scalars(
+            select(Comment.post_id).where(Comment.id.in_(ids)).distinct()
+        ).all()
+        selected = Comment.query.filter(Comment.id.in_(ids))
+        if action == 'approve':
+            count = selected.update({Comment.approved: True, Comment.is_spam: False}, synchronize_session=False)
+        elif action == 'reject':
+            count = selected.update({Comment.approved: False, Comment.is_spam: True}, synchronize_session=False)
+        else:
+            # Replies to deleted comments are kept as top-level comments
+            Comment.query.filter(Comment.parent_id.in_(ids)).update(
+                {Comment.parent_id: None}, synchronize_session=False)
+            count = selected.delete(synchronize_session=False)
+        Post.recount_comments(post_ids)
+        db.session.commit()
+        cache.delete('admin_count_comments_pending')
+        flash(f'{count} commentaire(s) mis à jour avec succès!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Erreur lors de la mise à jour: {str(e)}', 'danger')
+    
+    return redirect(url_for('admin_panel.comments', status=status))
+
+COMMENT_IMPORT_BATCH = 500
+
+@bp.route('/comments/import', methods=['POST'])
+@admin_required
+def import_comments():
+    """Import comments from a CSV file (post_slug, name, email, content,
+    created_at, approved), one multi-row INSERT and commit per 500 rows"""
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('Sélectionnez un fichier CSV.', 'warning')
+        return redirect(url_for('admin_panel.comments'))
+    
+    post_ids = dict(db.session.execute(select(Post.slug, Post.id)).all())
+    touched = set()
+    imported = skipped = 0
+    batch = []
+    
+    def flush():
+        # Bulk INSERT skips the Comment events: ua_hash is not needed (no
+        # user agent) and comment counters are recomputed at the end
+        db.session.execute(insert(Comment), batch)
+        db.session.commit()
+        batch.clear()
+    
+    try:
+        for row in csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig')):
+            post_id = post_ids.get((row.get('post_slug') or '').strip())
+            content = (row.get('content') or '').strip()
+            if not post_id or not content:
+                skipped += 1
+                continue
+            created_at = row.get('created_at')
+            batch.append({
+                'post_id': post_id,
+                'name': (row.get('name') or '').strip()[:100] or None,
+                'email': (row.get('email') or '').strip()[:120] or None,
+                'content': content,
+                'approved': (row.get('approved') or '').strip().lower() in ('1', 'true', 'oui', 'yes'),
+                'is_spam': False,
+                'created_at': datetime.fromisoformat(created_at) if created_at else datetime.utcnow(),
+            })
+            touched.add(post_id)
+            imported += 1
+            if len(batch) >= COMMENT_IMPORT_BATCH:
+                flush()
+        if batch:
+            flush()
+        if touched:
+            Post.recount_comments(list(touched))
+            db.session.commit()
+        cache.delete('admin_count_comments_pending')
+        flash(f'{imported} commentaire(s) importé(s), {skipped} ligne(s) ignorée(s).', 'success')
+    except Exception as e:
+        db.session.rollback()
+        # Batches already committed stay; fix the file and import the rest
+        flash(f"Erreur lors de l'import après {imported - len(batch)} commentaire(s): {str(e)}", 'danger')
+    
+    return redirect(url_for('admin_panel.comments'))
+
 @bp.route('/president-message/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_president_message():
     """View and edit the President's Message"""
@@ -1015,14 +1214,12 @@ def edit_president_message():
 
 # Communication Companies Management
 @bp.route('/communication-companies')
-@login_required
 @admin_required
 def communication_companies():
     companies = CommunicationCompany.query.order_by(CommunicationCompany.date_accompanied.desc()).all()
     return render_template('admin_panel/communication_companies.html', companies=companies)
 
 @bp.route('/communication-company/add', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def add_communication_company():
     if request.method == 'POST':
@@ -1030,19 +1227,14 @@ def add_communication_company():
         logo = request.form.get('logo', '').strip()
         description = request.form.get('description', '').strip()
         website = request.form.get('website', '').strip()
-        date_accompanied = request.form.get('date_accompagned')
-        if date_accompanied:
-            from datetime import datetime
-            date_accompagned = datetime.strptime(date_accompagned, '%Y-%m-%d').date()
-        else:
-            date_accompagned = None
+        date_accompanied = _parse_date(request.form.get('date_accompanied'))
         # TODO: handle file upload for logo if needed
         company = CommunicationCompany(
             name=name,
             logo=logo,
             description=description,
             website=website,
-            date_accompagned=date_accompagned
+            date_accompanied=date_accompanied
         )
         db.session.add(company)
         db.session.commit()
@@ -1051,7 +1243,6 @@ def add_communication_company():
     return render_template('admin_panel/communication_company_form.html', company=None)
 
 @bp.route('/communication-company/<int:company_id>/edit', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def edit_communication_company(company_id):
     company = CommunicationCompany.query.get_or_404(company_id)
@@ -1060,19 +1251,13 @@ def edit_communication_company(company_id):
         company.logo = request.form.get('logo', '').strip()
         company.description = request.form.get('description', '').strip()
         company.website = request.form.get('website', '').strip()
-        date_accompagned = request.form.get('date_accompagned')
-        if date_accompagned:
-            from datetime import datetime
-            company.date_accompagned = datetime.strptime(date_accompagned, '%Y-%m-%d').date()
-        else:
-            company.date_accompagned = None
+        company.date_accompanied = _parse_date(request.form.get('date_accompanied'))
         db.session.commit()
         flash('Entreprise modifiée avec succès!', 'success')
         return redirect(url_for('admin_panel.communication_companies'))
     return render_template('admin_panel/communication_company_form.html', company=company)
 
 @bp.route('/communication-company/<int:company_id>/delete')
-@login_required
 @admin_required
 def delete_communication_company(company_id):
     company = CommunicationCompany.query.get_or_404(company_id)
@@ -1082,7 +1267,6 @@ def delete_communication_company(company_id):
     return redirect(url_for('admin_panel.communication_companies'))
 
 @bp.route('/profile', methods=['GET', 'POST'])
-@login_required
 @admin_required
 def profile():
     user = current_user
@@ -1131,6 +1315,7 @@ def profile():
         else:
             try:
                 db.session.commit()
+                user.forget_cached()
                 flash("Profil mis à jour avec succès!", 'success')
                 return redirect(url_for('admin_panel.profile'))
             except Exception as e:
@@ -1166,14 +1351,20 @@ def redeem_admin_token():
         return redirect(url_for('admin_panel.dashboard'))
     if request.method == 'POST':
         token_str = request.form.get('token', '').strip()
-        token_obj = AdminInviteToken.query.filter_by(token=token_str).first()
-        if not token_obj or not token_obj.is_valid():
+        # Claim the token with one conditional UPDATE (no row load, can't be redeemed twice)
+        claimed = db.session.execute(
+            update(AdminInviteToken).where(
+                AdminInviteToken.token == token_str,
+                AdminInviteToken.used == False,
+                AdminInviteToken.expires_at > datetime.utcnow()
+            ).values(used=True, used_by=current_user.id)
+        ).rowcount
+        if not claimed:
             flash("Token invalide ou expiré.", "danger")
         else:
-            token_obj.used = True
-            token_obj.used_by = current_user.id
             current_user.is_admin = True
             db.session.commit()
+            current_user.forget_cached()
             flash("Vous êtes maintenant administrateur!", "success")
             return redirect(url_for('admin_panel.dashboard'))
     return render_template('admin_panel/redeem_admin_token.html')
@@ -1185,7 +1376,6 @@ def send_admin_invite():
         flash("Accès refusé. Seul le General Admin peut inviter un admin.", "danger")
         return redirect(url_for('admin_panel.dashboard'))
     email = request.form.get('email', '').strip()
-    from app.main.routes import is_valid_email
     if not email or not is_valid_email(email):
         flash("Adresse email invalide.", "danger")
         return redirect(url_for('admin_panel.dashboard'))
@@ -1193,18 +1383,15 @@ def send_admin_invite():
     token_obj = AdminInviteToken.generate_token()
     db.session.add(token_obj)
     db.session.commit()
-    # Send email
-    try:
-        invite_url = url_for('admin_panel.redeem_admin_token', _external=True)
-        msg = Message(
-            subject="Invitation à devenir administrateur ELMA Group",
-            recipients=[email],
-            body=f"Bonjour,\n\nVous avez été invité à devenir administrateur sur ELMA Group.\n\nUtilisez ce token : {token_obj.token}\nOu cliquez sur ce lien : {invite_url}\n\nCe token est valable 24h et utilisable une seule fois.\n\nCordialement,\nL'équipe ELMA Group"
-        )
-        mail.send(msg)
-        flash(f"Invitation envoyée à {email}.", "success")
-    except Exception as e:
-        flash(f"Erreur lors de l'envoi de l'email: {str(e)}", "danger")
+    # Send email (the token is committed first so it is valid when the mail arrives)
+    invite_url = url_for('admin_panel.redeem_admin_token', _external=True)
+    msg = Message(
+        subject="Invitation à devenir administrateur ELMA Group",
+        recipients=[email],
+        body=f"Bonjour,\n\nVous avez été invité à devenir administrateur sur ELMA Group.\n\nUtilisez ce token : {token_obj.token}\nOu cliquez sur ce lien : {invite_url}\n\nCe token est valable 24h et utilisable une seule fois.\n\nCordialement,\nL'équipe ELMA Group"
+    )
+    send_email_async(msg)
+    flash(f"Invitation envoyée à {email}.", "success")
     return redirect(url_for('admin_panel.dashboard'))
 
 @bp.route('/admin-logs')
@@ -1213,6 +1400,33 @@ def admin_logs():
     if not current_user.is_general_manager:
         flash("Accès refusé. Seul le General Admin peut voir le journal des actions.", "danger")
         return redirect(url_for('admin_panel.dashboard'))
-    page = request.args.get('page', 1, type=int)
-    logs = AdminActionLog.query.order_by(AdminActionLog.timestamp.desc()).paginate(page=page, per_page=30, error_out=False)
-    return render_template('admin_panel/admin_logs.html', logs=logs)
+    logs = keyset_paginate(AdminActionLog.query.order_by(AdminActionLog.timestamp.desc(), AdminActionLog.id.desc()), per_page=30)
+    return render_template('admin_panel/admin_logs.html', logs=logs,
+                         total_estimate=estimated_count(AdminActionLog))
+
+@bp.route('/admin-logs/export')
+@general_manager_required
+def export_admin_logs():
+    """Whole action log as CSV, streamed row by row (constant memory)"""
+    performer = aliased(User)
+    target = aliased(User)
+    stmt = select(
+        AdminActionLog.timestamp, AdminActionLog.action,
+        performer.email, target.email, AdminActionLog.details
+    ).join(performer, AdminActionLog.performed_by).join(target, AdminActionLog.target_user
+    ).order_by(AdminActionLog.timestamp.desc(), AdminActionLog.id.desc()
+    ).execution_options(yield_per=1000)  # server-side cursor on PostgreSQL
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['Date', 'Action', 'Effectué par', 'Cible', 'Détails'])
+        for timestamp, action, performed_by, target_user, details in db.session.execute(stmt):
+            writer.writerow([timestamp.strftime('%d/%m/%Y %H:%M'), action, performed_by, target_user, details or ''])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=journal_actions_admin.csv'})
@@ -19,6 +19,7 @@ def login():
         
         if user and user.check_password(password):
             login_user(user, remember=remember)
+            user.forget_cached()  # next request reloads fresh privileges
             next_page = request.args.get('next')
             if not next_page or not next_page.startswith('/'):
                 next_page = url_for('main.index')
@@ -33,6 +34,7 @@ def login():
 @bp.route('/logout')
 @login_required
 def logout():
+    current_user.forget_cached()
     logout_user()
     flash('Vous avez été déconnecté.', 'info')
     return redirect(url_for('main.index'))
@@ -54,9 +56,9 @@ def register():
         # Validation
         if password != password2:
             flash('Les mots de passe ne correspondent pas.', 'danger')
-        elif User.query.filter_by(username=username).first():
+        elif db.session.query(User.query.filter_by(username=username).exists()).scalar():
             flash('Ce nom d\'utilisateur existe déjà.', 'danger')
-        elif User.query.filter_by(email=email).first():
+        elif db.session.query(User.query.filter_by(email=email).exists()).scalar():
             flash('Cette adresse email est déjà utilisée.', 'danger')
         else:
             user = User(
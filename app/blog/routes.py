@@ -1,42 +1,60 @@
 from flask import render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required, current_user
 from app.blog import bp
-from app.models import Post, Comment, Category, Tag, User
-from app.extensions import db
-from datetime import datetime
-from sqlalchemy import desc, asc, func
+from app.models import Post, Comment, Category, Tag, User, user_agent_hash
+from app.extensions import db, cache, skip_page_cache
+from app.pagination import keyset_paginate
+from app.counters import bump_views
+from app.conditional import conditional_page
+from datetime import datetime, timedelta
+from sqlalchemy import desc, asc
+from sqlalchemy.orm import joinedload, selectinload, defer
+from markupsafe import Markup
 import re
 
+def post_list_options():
+    """Loader options for post cards: category and tags in O(1) queries, and
+    no content (cards use the stored excerpt/word_count). Cards show the
+    denormalized author_display_name, so the author isn't loaded"""
+    return (defer(Post.content), joinedload(Post.category), selectinload(Post.tags))
+
+def cached_posts(key, query):
+    """Posts for a page strip, cached for 60 seconds. Cached copies (with their
+    eager-loaded relations) are attached to the session without querying."""
+    posts = cache.get(key)
+    if posts is None:
+        posts = query.all()
+        cache.set(key, posts, timeout=60)
+        return posts
+    return [db.session.merge(post, load=False) for post in posts]
+
 @bp.route('/')
 @bp.route('/index')
+@cache.cached(timeout=60, query_string=True, unless=skip_page_cache)
 def index():
     """Blog homepage with posts listing"""
-    page = request.args.get('page', 1, type=int)
-    
     # Base query for published posts
-    query = Post.query.filter_by(published=True)
+    query = Post.query.options(*post_list_options()).filter_by(published=True)
     
-    # Apply sorting
-    query = query.order_by(desc(Post.published_at))
+    # Apply sorting (id breaks ties so the keyset is unique)
+    query = query.order_by(*Post.listing_order())
     
     # Paginate results
-    posts = query.paginate(
-        page=page, 
-        per_page=current_app.config.get('POSTS_PER_PAGE', 10),
-        error_out=False
-    )
+    posts = keyset_paginate(query, per_page=current_app.config.get('POSTS_PER_PAGE', 10))
     
-    # Featured/pinned posts for top of page
-    featured_posts = Post.query.filter_by(
+    # Featured/pinned posts for top of page (cached for a minute)
+    featured_posts = cached_posts('blog_featured_posts', Post.query.options(*post_list_options()).filter_by(
         published=True, 
         is_featured=True
-    ).order_by(desc(Post.published_at)).limit(3).all()
+    ).order_by(desc(Post.published_at)).limit(3))
     
     # Get categories for sidebar
-    categories = Category.query.all()
+    categories = Category.get_cached_list()
     
-    # Get popular posts for sidebar (by views)
-    popular_posts = Post.query.filter_by(published=True).order_by(desc(Post.views)).limit(3).all()
+    # Get popular posts for sidebar (recent views, see Post.trending_score; cached for a minute)
+    popular_posts = cached_posts('blog_popular_posts', Post.query.options(*post_list_options()).filter_by(
+        published=True
+    ).order_by(desc(Post.trending_score), desc(Post.views)).limit(3))
     
     return render_template('blog/index.html',
                          posts=posts,
@@ -47,36 +65,42 @@ def index():
 @bp.route('/post/<slug>')
 def post_detail(slug):
     """Individual post page"""
-    post = Post.query.filter_by(slug=slug, published=True).first_or_404()
-    
-    # Increment view count
-    post.views += 1
-    db.session.commit()
-    
-    # Get approved comments
-    comments = Comment.query.filter_by(
-        post=post, 
-        approved=True, 
-        parent_id=None  # Top-level comments only
-    ).order_by(Comment.created_at.asc()).all()
-    
-    # Get related posts (same category, excluding current post)
-    related_posts = []
-    if post.category:
-        related_posts = Post.query.filter(
-            Post.category == post.category,
-            Post.published == True,
-            Post.id != post.id
-        ).order_by(desc(Post.published_at)).limit(4).all()
-    
-    # Get categories for sidebar
-    categories = Category.query.all()
-    
-    return render_template('blog/post.html',
-                         post=post,
-                         comments=comments,
-                         related_posts=related_posts,
-                         categories=categories)
+    post = Post.query.options(joinedload(Post.category), selectinload(Post.tags), joinedload(Post.author)).filter_by(slug=slug, published=True).first_or_404()
+    
+    # Count the visit (buffered, written in batches); admin visits don't count
+    if not (current_user.is_authenticated and current_user.is_admin):
+        bump_views(Post, post.id)
+    
+    def render():
+        # Get approved comments
+        comments = Comment.query.options(selectinload(Comment.author)).filter_by(
+            post=post, 
+            approved=True, 
+            parent_id=None  # Top-level comments only
+        ).order_by(Comment.created_at.asc()).all()
+        
+        # Get related posts (same category, excluding current post)
+        related_posts = []
+        if post.category:
+            related_posts = Post.query.options(*post_list_options()).filter(
+                Post.category == post.category,
+                Post.published == True,
+                Post.id != post.id
+            ).order_by(desc(Post.published_at)).limit(4).all()
+        
+        # Get categories for sidebar
+        categories = Category.get_cached_list()
+        
+        return render_template('blog/post.html',
+                             post=post,
+                             comments=comments,
+                             related_posts=related_posts,
+                             categories=categories)
+    
+    # Repeat visits of an unchanged post get a 304 without the queries above
+    # (the view count shown may lag until the post or its comments change)
+    return conditional_page((post.id, post.updated_at, post.comment_count),
+                            render, last_modified=post.updated_at)
 
 @bp.route('/post/<slug>/comment', methods=['POST'])
 def add_comment(slug):
@@ -98,6 +122,20 @@ def add_comment(slug):
         flash('Veuillez remplir tous les champs obligatoires.', 'error')
         return redirect(url_for('blog.post_detail', slug=slug))
     
+    # Ignore a resubmission of the same comment from the same client (double
+    # posts, naive bots); matched on the indexed User-Agent hash
+    ua_hash = user_agent_hash(request.user_agent.string)
+    duplicate = db.session.query(Comment.query.filter(
+        Comment.ua_hash == ua_hash,
+        Comment.post_id == post.id,
+        Comment.ip_address == request.remote_addr,
+        Comment.content == content,
+        Comment.created_at >= datetime.utcnow() - timedelta(minutes=10)
+    ).exists()).scalar()
+    if duplicate:
+        flash('Ce commentaire a déjà été publié.', 'info')
+        return redirect(url_for('blog.post_detail', slug=slug))
+    
     # Create comment
     comment = Comment(
         content=content,
@@ -108,6 +146,7 @@ def add_comment(slug):
         author=current_user if current_user.is_authenticated else None,
         ip_address=request.remote_addr,
         user_agent=request.user_agent.string,
+        ua_hash=ua_hash,
         approved=True  # Auto-approve comments (admin can delete later)
     )
     
@@ -125,16 +164,12 @@ def add_comment(slug):
 def category(slug):
     """Posts by category"""
     category = Category.query.filter_by(slug=slug).first_or_404()
-    page = request.args.get('page', 1, type=int)
     
-    posts = Post.query.filter_by(
+    query = Post.query.options(*post_list_options()).filter_by(
         category=category, 
         published=True
-    ).order_by(desc(Post.published_at)).paginate(
-        page=page, 
-        per_page=current_app.config.get('POSTS_PER_PAGE', 10),
-        error_out=False
-    )
+    ).order_by(*Post.listing_order())
+    posts = keyset_paginate(query, per_page=current_app.config.get('POSTS_PER_PAGE', 10))
     
     return render_template('blog/category.html',
                          category=category,
@@ -144,24 +179,18 @@ def category(slug):
 def search():
     """Search blog posts"""
     query = request.args.get('q', '').strip()
-    page = request.args.get('page', 1, type=int)
     
     if not query:
         return redirect(url_for('blog.index'))
     
-    # Search in title and content
-    search_results = Post.query.filter(
+    # Search in title, excerpt and content (full-text on PostgreSQL, see Post.search);
+    # newest first rather than by rank, as the keyset cursor needs a stable order
+    matches, _ = Post.search(query)
+    results_query = Post.query.options(*post_list_options()).filter(
         Post.published == True,
-        db.or_(
-            Post.title.contains(query),
-            Post.content.contains(query),
-            Post.excerpt.contains(query)
-        )
-    ).order_by(desc(Post.published_at)).paginate(
-        page=page,
-        per_page=current_app.config.get('POSTS_PER_PAGE', 10),
-        error_out=False
-    )
+        matches
+    ).order_by(*Post.listing_order())
+    search_results = keyset_paginate(results_query, per_page=current_app.config.get('POSTS_PER_PAGE', 10))
     
     return render_template('blog/search.html',
                          query=query,
@@ -169,15 +198,25 @@ def search():
 
 # Template filters for blog
 @bp.app_template_filter('excerpt')
-def excerpt_filter(text, length=150):
-    """Create excerpt from text"""
+def excerpt_filter(post, length=150):
+    """Excerpt of a post (stored at write time) or of plain text"""
+    if isinstance(post, Post):
+        if post.excerpt:
+            return post.excerpt
+        text = Markup(post.content or '').striptags()
+    else:
+        text = post
     if len(text) <= length:
         return text
     return text[:length].rsplit(' ', 1)[0] + '...'
 
 @bp.app_template_filter('reading_time')
-def reading_time_filter(text):
-    """Estimate reading time for text"""
-    words = len(text.split())
-    minutes = max(1, round(words / 200))  # Assume 200 words per minute
+def reading_time_filter(post):
+    """Reading time of a post (stored at write time) or of plain text"""
+    if isinstance(post, Post) and post.reading_time:
+        minutes = post.reading_time
+    else:
+        # ~5 characters per word at 200 words per minute, without splitting the text
+        text = str(post.content if isinstance(post, Post) else post)
+        minutes = max(1, round(len(text) / 1000))
     return f"{minutes} min de lecture"
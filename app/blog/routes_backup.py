@@ -1,23 +1,32 @@
 from flask import render_template, request, flash, redirect, url_for, jsonify, current_app
 from app.blog import bp
 from app.models import Post, Comment, Category, Tag, User
-from app.extensions import db
-from datetime import datetime, timedelta
-from sqlalchemy import desc, asc, func
+from app.extensions import db, cache, skip_page_cache
+from app.pagination import keyset_paginate
+from app.counters import bump_views
+from app.conditional import conditional
+from app.main.routes import is_valid_email
+from datetime import datetime
+from sqlalchemy import desc, asc, func, event, select, literal, union_all
+from sqlalchemy.orm import selectinload, defer
 import re
 
+def post_list_options():
+    """Eager loads for post lists (author, category and tags in one IN query each)"""
+    return (selectinload(Post.author), selectinload(Post.category), selectinload(Post.tags))
+
 @bp.route('/')
 @bp.route('/index')
+@cache.cached(timeout=60, query_string=True, unless=skip_page_cache)
 def index():
     """Blog homepage with posts listing"""
-    page = request.args.get('page', 1, type=int)
     category_slug = request.args.get('category')
     tag_slug = request.args.get('tag')
     author_id = request.args.get('author', type=int)
     sort_by = request.args.get('sort', 'latest')  # latest, popular, oldest
 
     # Base query for published posts
-    query = Post.query.filter_by(published=True)
+    query = Post.query.options(*post_list_options()).filter_by(published=True)
 
     # Apply filters
     if category_slug:
@@ -32,36 +41,30 @@ def index():
         author = User.query.get_or_404(author_id)
         query = query.filter_by(author=author)
 
-    # Apply sorting
+    # Apply sorting (id breaks ties so the keyset is unique)
     if sort_by == 'popular':
-        query = query.order_by(desc(Post.views))
+        query = query.order_by(desc(Post.views), desc(Post.id))
     elif sort_by == 'oldest':
-        query = query.order_by(asc(Post.published_at))
+        query = query.order_by(asc(Post.published_at), asc(Post.id))
     else:  # latest (default)
-        query = query.order_by(desc(Post.published_at))
+        query = query.order_by(desc(Post.published_at), desc(Post.id))
 
-    # Paginate results
-    posts = query.paginate(
-        page=page,
-        per_page=current_app.config.get('POSTS_PER_PAGE', 10),
-        error_out=False
-    )
+    # Paginate results by cursor (no COUNT, no OFFSET)
+    posts = keyset_paginate(query, per_page=current_app.config.get('POSTS_PER_PAGE', 10))
 
     # Get sidebar data
     sidebar_data = get_sidebar_data()
 
     # Featured/pinned posts for top of page
-    featured_posts = Post.query.filter_by(
+    featured_posts = Post.query.options(*post_list_options()).filter_by(
         published=True,
         is_featured=True
     ).order_by(desc(Post.published_at)).limit(3).all()
 
-    # Popular posts this month
-    one_month_ago = datetime.utcnow() - timedelta(days=30)
-    popular_posts = Post.query.filter(
-        Post.published == True,
-        Post.created_at >= one_month_ago
-    ).order_by(desc(Post.views)).limit(5).all()
+    # Popular posts (recent views, see Post.trending_score)
+    popular_posts = Post.query.options(*post_list_options()).filter(
+        Post.published == True
+    ).order_by(desc(Post.trending_score)).limit(5).all()
 
     return render_template(
         'blog/index.html',
@@ -78,50 +81,47 @@ def index():
 @bp.route('/post/<slug>')
 def post_detail(slug):
     """Individual post page"""
-    post = Post.query.filter_by(slug=slug, published=True).first_or_404()
+    post = Post.query.options(selectinload(Post.author), selectinload(Post.category), selectinload(Post.tags)).filter_by(slug=slug, published=True).first_or_404()
 
-    # Increment view count
-    post.views += 1
-    db.session.commit()
+    # Count the visit (buffered, written in batches)
+    bump_views(Post, post.id)
 
     # Get approved comments
-    comments = Comment.query.filter_by(
+    comments = Comment.query.options(selectinload(Comment.author)).filter_by(
         post=post,
         approved=True,
         parent_id=None  # Top-level comments only
     ).order_by(Comment.created_at.asc()).all()
 
-    # Get related posts (same category, excluding current post)
-    related_posts = []
-    if post.category:
-        related_posts = Post.query.filter(
-            Post.category == post.category,
-            Post.published == True,
-            Post.id != post.id
-        ).order_by(desc(Post.published_at)).limit(4).all()
-
-    # If not enough related posts, get recent posts
-    if len(related_posts) < 4:
-        additional_posts = Post.query.filter(
-            Post.published == True,
-            Post.id != post.id,
-            ~Post.id.in_([p.id for p in related_posts])
-        ).order_by(desc(Post.published_at)).limit(4 - len(related_posts)).all()
-        related_posts.extend(additional_posts)
+    # Get related posts: same category first, topped up with recent posts
+    ordering = [desc(Post.published_at)]
+    if post.category_id:
+        ordering.insert(0, (Post.category_id == post.category_id).desc())
+    related_posts = Post.query.options(*post_list_options()).filter(
+        Post.published == True,
+        Post.id != post.id
+    ).order_by(*ordering).limit(4).all()
 
     # Get sidebar data
     sidebar_data = get_sidebar_data()
 
-    # Previous and next posts
-    prev_post = Post.query.filter(
+    # Previous and next posts, in one round trip
+    prev_id = select(Post.id, literal('prev').label('direction')).where(
         Post.published == True,
         Post.published_at < post.published_at
-    ).order_by(desc(Post.published_at)).first()
-
-    next_post = Post.query.filter(
+    ).order_by(desc(Post.published_at)).limit(1).subquery()
+    next_id = select(Post.id, literal('next').label('direction')).where(
         Post.published == True,
         Post.published_at > post.published_at
-    ).order_by(asc(Post.published_at)).first()
+    ).order_by(asc(Post.published_at)).limit(1).subquery()
+    neighbours = union_all(select(prev_id), select(next_id)).subquery()
+    adjacent = dict(
+        (direction, neighbour) for neighbour, direction in db.session.query(Post, neighbours.c.direction)
+        .options(defer(Post.content))
+        .join(neighbours, Post.id == neighbours.c.id)
+    )
+    prev_post = adjacent.get('prev')
+    next_post = adjacent.get('next')
 
     return render_template(
         'blog/post.html',
@@ -198,7 +198,7 @@ def category(slug):
     category = Category.query.filter_by(slug=slug).first_or_404()
     page = request.args.get('page', 1, type=int)
 
-    posts = Post.query.filter_by(
+    posts = Post.query.options(*post_list_options()).filter_by(
         category=category,
         published=True
     ).order_by(desc(Post.published_at)).paginate(
@@ -222,7 +222,7 @@ def tag(slug):
     tag = Tag.query.filter_by(slug=slug).first_or_404()
     page = request.args.get('page', 1, type=int)
 
-    posts = Post.query.filter(
+    posts = Post.query.options(*post_list_options()).filter(
         Post.tags.contains(tag),
         Post.published == True
     ).order_by(desc(Post.published_at)).paginate(
@@ -246,7 +246,7 @@ def author(author_id):
     author = User.query.get_or_404(author_id)
     page = request.args.get('page', 1, type=int)
 
-    posts = Post.query.filter_by(
+    posts = Post.query.options(*post_list_options()).filter_by(
         author=author,
         published=True
     ).order_by(desc(Post.published_at)).paginate(
@@ -271,30 +271,18 @@ def archive():
     month = request.args.get('month', type=int)
 
     # Get archive data
-    archive_data = db.session.query(
-        func.strftime('%Y', Post.published_at).label('year'),
-        func.strftime('%m', Post.published_at).label('month'),
-        func.count(Post.id).label('count')
-    ).filter(
-        Post.published == True,
-        Post.published_at.isnot(None)
-    ).group_by('year', 'month').order_by(desc('year'), desc('month')).all()
+    archive_data = get_archive_data()
 
     # Filter posts if year/month specified
-    query = Post.query.filter_by(published=True)
+    query = Post.query.options(*post_list_options()).filter_by(published=True)
 
     if year:
         if month:
             # Specific month and year
-            query = query.filter(
-                func.strftime('%Y', Post.published_at) == str(year),
-                func.strftime('%m', Post.published_at) == f'{month:02d}'
-            )
+            query = query.filter(Post.published_ym == f'{year:04d}-{month:02d}')
         else:
             # Specific year only
-            query = query.filter(
-                func.strftime('%Y', Post.published_at) == str(year)
-            )
+            query = query.filter(Post.published_ym.startswith(f'{year:04d}-'))
 
     page = request.args.get('page', 1, type=int)
     posts = query.order_by(desc(Post.published_at)).paginate(
@@ -322,14 +310,11 @@ def search():
 
     posts = None
     if query and len(query) >= 2:
-        posts = Post.query.filter(
+        matches, ranking = Post.search(query)
+        posts = Post.query.options(*post_list_options()).filter(
             Post.published == True,
-            db.or_(
-                Post.title.contains(query),
-                Post.content.contains(query),
-                Post.excerpt.contains(query)
-            )
-        ).order_by(desc(Post.published_at)).paginate(
+            matches
+        ).order_by(*ranking, desc(Post.published_at)).paginate(
             page=page,
             per_page=current_app.config.get('POSTS_PER_PAGE', 10),
             error_out=False
@@ -345,21 +330,69 @@ def search():
     )
 
 @bp.route('/rss.xml')
+@conditional
+@cache.cached(timeout=600)
 def rss():
     """RSS feed for blog posts"""
     from flask import Response
 
-    posts = Post.query.filter_by(published=True).order_by(
+    posts = Post.query.options(*post_list_options()).filter_by(published=True).order_by(
         desc(Post.published_at)
     ).limit(20).all()
 
     rss_xml = render_template('blog/rss.xml', posts=posts)
-    return Response(rss_xml, mimetype='application/rss+xml')
+    response = Response(rss_xml, mimetype='application/rss+xml')
+    if posts:
+        response.last_modified = max(p.updated_at or p.published_at for p in posts)
+    return response
+
+SIDEBAR_CACHE_KEY = 'blog_sidebar'
 
 def get_sidebar_data():
-    """Get common sidebar data for blog pages"""
+    """Get common sidebar data for blog pages (cached for 5 minutes)"""
+    data = cache.get(SIDEBAR_CACHE_KEY)
+    if data is None:
+        data = _load_sidebar_data()
+        cache.set(SIDEBAR_CACHE_KEY, data, timeout=300)
+
+    # Attach the cached instances to this request's session without querying
+    return {
+        'recent_posts': [db.session.merge(post, load=False) for post in data['recent_posts']],
+        'categories': [(db.session.merge(category, load=False), count) for category, count in data['categories']],
+        'popular_tags': [(db.session.merge(tag, load=False), count) for tag, count in data['popular_tags']],
+        'archive_months': data['archive_months']
+    }
+
+ARCHIVE_CACHE_KEY = 'blog_archive'
+
+def get_archive_data():
+    """Published post counts per month, newest first (cached like the sidebar)"""
+    archive_data = cache.get(ARCHIVE_CACHE_KEY)
+    if archive_data is None:
+        # Grouped on the stored, indexed month
+        archive_data = [row._asdict() for row in db.session.query(
+            func.substr(Post.published_ym, 1, 4).label('year'),
+            func.substr(Post.published_ym, 6, 2).label('month'),
+            func.count(Post.id).label('count')
+        ).filter(
+            Post.published == True,
+            Post.published_ym.isnot(None)
+        ).group_by(Post.published_ym).order_by(desc(Post.published_ym))]
+        cache.set(ARCHIVE_CACHE_KEY, archive_data, timeout=300)
+    return archive_data
+
+def _invalidate_sidebar(mapper, connection, target):
+    cache.delete_many(SIDEBAR_CACHE_KEY, ARCHIVE_CACHE_KEY)
+
+# Any post, category or tag write may change the sidebar and archive counts
+for model in (Post, Category, Tag):
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, event_name, _invalidate_sidebar)
+
+def _load_sidebar_data():
+    """Run the sidebar queries"""
     # Recent posts
-    recent_posts = Post.query.filter_by(published=True).order_by(
+    recent_posts = Post.query.options(*post_list_options()).filter_by(published=True).order_by(
         desc(Post.published_at)
     ).limit(5).all()
 
@@ -381,37 +414,33 @@ def get_sidebar_data():
 
     # Archive links (last 12 months)
     archive_months = db.session.query(
-        func.strftime('%Y-%m', Post.published_at).label('month'),
+        Post.published_ym.label('month'),
         func.count(Post.id).label('count')
     ).filter(
         Post.published == True,
-        Post.published_at.isnot(None)
-    ).group_by('month').order_by(desc('month')).limit(12).all()
+        Post.published_ym.isnot(None)
+    ).group_by(Post.published_ym).order_by(desc(Post.published_ym)).limit(12).all()
 
     return {
         'recent_posts': recent_posts,
-        'categories': categories,
-        'popular_tags': popular_tags,
-        'archive_months': archive_months
+        'categories': [tuple(row) for row in categories],
+        'popular_tags': [tuple(row) for row in popular_tags],
+        'archive_months': [tuple(row) for row in archive_months]
     }
 
-def is_valid_email(email):
-    """Simple email validation"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+# Matched against lowercased text
+SPAM_RES = [re.compile(pattern) for pattern in (
+    r'\b(viagra|cialis|pharmacy|casino|poker|loan|mortgage)\b',
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
+    r'\b\w+\.(com|net|org|ru|cn)\b',
+)]
 
 def is_likely_spam(content, name, email):
     """Basic spam detection"""
-    spam_patterns = [
-        r'\b(viagra|cialis|pharmacy|casino|poker|loan|mortgage)\b',
-        r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
-        r'\b\w+\.(com|net|org|ru|cn)\b',
-    ]
-
     text_to_check = f"{content} {name} {email}".lower()
 
-    for pattern in spam_patterns:
-        if re.search(pattern, text_to_check, re.IGNORECASE):
+    for spam_re in SPAM_RES:
+        if spam_re.search(text_to_check):
             return True
 
     # Check for excessive repetition
@@ -433,7 +462,11 @@ def excerpt_filter(text, length=150):
 
 @bp.app_template_filter('reading_time')
 def reading_time_filter(text):
-    """Estimate reading time for text"""
-    words = len(text.split())
-    minutes = max(1, round(words / 200))  # Assume 200 words per minute
+    """Estimate reading time for a post or text"""
+    if isinstance(text, Post):
+        if text.reading_time:
+            return f"{text.reading_time} min de lecture"
+        text = text.content or ''
+    # ~5 characters per word at 200 words per minute, without splitting the text
+    minutes = max(1, round(len(text) / 1000))
     return f"{minutes} min de lecture"
\ No newline at end of file
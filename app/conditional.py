@@ -0,0 +1,40 @@
+"""Conditional GET (ETag / Last-Modified) for public pages."""
+import hashlib
+from functools import wraps
+from flask import request, session, make_response, current_app
+from flask_login import current_user
+
+
+def conditional_page(version, render, last_modified=None):
+    """Answer 304 when the browser already holds this version of the page,
+    otherwise render it.
+
+    ``version`` is anything that changes with the page content. The signed-in
+    user is part of the ETag since base.html renders the user menu, and pages
+    with a pending flash message are always rendered.
+    """
+    if '_flashes' in session:
+        return render()
+    etag = hashlib.md5(f'{version}|{current_user.get_id()}'.encode()).hexdigest()
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # always revalidate (new comments, reviews)
+    return response
+
+
+def conditional(view):
+    """Turn the full response of ``view`` into a 304 when the browser's copy is
+    current. Goes above @cache.cached, so only full pages are ever cached."""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if not response.get_etag()[0]:
+            response.add_etag()
+        return response.make_conditional(request)
+    return decorated_function
@@ -12,6 +12,19 @@ class Config:
         'sqlite:///' + os.path.join(basedir, '..', 'elma_app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool for server databases; SQLite keeps Flask-SQLAlchemy's
+    # defaults (StaticPool for in-memory databases)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 20,
+        'max_overflow': 10,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        'pool_timeout': 5
+    } if not SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {}
+    
+    # Log queries slower than this (seconds) when SQLALCHEMY_RECORD_QUERIES is on
+    SLOW_QUERY_THRESHOLD = 0.05
+    
     # Upload settings
     UPLOAD_FOLDER = os.path.join(basedir, 'static/uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
@@ -22,9 +35,33 @@ class Config:
     TESTIMONIALS_PER_PAGE = 9
     COMMENTS_PER_PAGE = 20
     
+    # Cache settings
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = 300
+    # Let delete_many() go on past keys that are not cached (SimpleCache stops otherwise)
+    CACHE_IGNORE_ERRORS = True
+    
+    # Page-view counters are buffered and written at most this often (seconds)
+    VIEW_FLUSH_INTERVAL = 30
+    # ... and Post.trending_score (popular posts) is recomputed at most this often
+    TRENDING_REFRESH_INTERVAL = 300
+    
+    # Rate limiting (shares the Redis instance when REDIS_URL is set)
+    RATELIMIT_STORAGE_URI = os.environ.get('REDIS_URL', 'memory://')
+    
+    # Static files: served by nginx (or a CDN when CDN_DOMAIN is set) with
+    # far-future expiry; url_for('static') adds a ?v= fingerprint
+    CDN_DOMAIN = os.environ.get('CDN_DOMAIN')
+    
     # Flask-Admin settings
     FLASK_ADMIN_SWATCH = 'cosmo'
     
+    # Endpoint profiling with Flask-MonitoringDashboard (opt-in, at /monitoring)
+    MONITORING_DASHBOARD = os.environ.get('MONITORING_DASHBOARD', 'false').lower() in ['true', 'on', '1']
+    MONITORING_DASHBOARD_CONFIG = os.path.join(basedir, '..', 'dashboard.cfg')
+    MONITORING_DASHBOARD_USERNAME = os.environ.get('MONITORING_DASHBOARD_USERNAME', 'admin')
+    MONITORING_DASHBOARD_PASSWORD = os.environ.get('MONITORING_DASHBOARD_PASSWORD')
+    
     # File upload settings
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
     
@@ -52,6 +89,7 @@ class Config:
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQLALCHEMY_RECORD_QUERIES = True
     
 class ProductionConfig(Config):
     DEBUG = False
@@ -62,12 +100,21 @@ class ProductionConfig(Config):
     
     # Production database settings
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': 10,
-        'pool_recycle': 300,
+        'pool_size': 20,
+        'max_overflow': 20,
+        'pool_recycle': 1800,
         'pool_pre_ping': True,
+        'pool_timeout': 5,
+        # Reuse the most recent connection so surplus idle ones age out
+        'pool_use_lifo': True,
+        # Compiled SQL kept per engine (default 500)
+        'query_cache_size': 1200,
         'connect_args': {
             'sslmode': 'require',
-            'connect_timeout': 10
+            'connect_timeout': 10,
+            # Cancel runaway queries (ms); streamed exports fetch in batches,
+            # each FETCH is its own statement
+            'options': '-c statement_timeout=' + os.environ.get('DB_STATEMENT_TIMEOUT', '5000')
         }
     }
     
@@ -79,9 +126,18 @@ class ProductionConfig(Config):
     # Security settings
     WTF_CSRF_ENABLED = True
     
+    # One cache shared by all Gunicorn workers (SimpleCache is per process)
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'RedisCache')
+    CACHE_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_KEY_PREFIX = 'elma_'
+    
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    CACHE_TYPE = 'NullCache'
+    RATELIMIT_ENABLED = False
+    VIEW_FLUSH_INTERVAL = 0  # in-memory SQLite is per connection
     
 config = {
     'development': DevelopmentConfig,
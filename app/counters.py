@@ -0,0 +1,64 @@
+"""Buffered page-view counters.
+
+Detail pages count views in an in-process buffer instead of writing a row on
+every hit. The request that finds the buffer older than VIEW_FLUSH_INTERVAL
+seconds hands it to a background worker, which applies it with one batched
+UPDATE per counter column. Counts still buffered when a worker process exits
+are lost, which is acceptable for view statistics.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import bindparam
+from app.extensions import db
+
+_lock = threading.Lock()
+_pending = {}  # (model, column) -> {row id: views}
+_last_flush = time.monotonic()
+_flush_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def bump_views(model, row_id, column='views'):
+    """Count one view of ``model`` row ``row_id``"""
+    global _last_flush
+    interval = current_app.config.get('VIEW_FLUSH_INTERVAL', 30)
+    with _lock:
+        counts = _pending.setdefault((model, column), {})
+        counts[row_id] = counts.get(row_id, 0) + 1
+        if time.monotonic() - _last_flush < interval:
+            return
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    app = current_app._get_current_object()
+    if interval <= 0:
+        # Unbuffered (testing): write in the request, on the request's database
+        flush_views(app, batch)
+    else:
+        _flush_executor.submit(flush_views, app, batch)
+
+
+def flush_views(app, batch):
+    """Add the buffered counts to their rows, one executemany UPDATE per column"""
+    with app.app_context():
+        try:
+            for (model, column), counts in batch.items():
+                table = model.__table__
+                values = {column: table.c[column] + bindparam('delta')}
+                if 'updated_at' in table.c:
+                    # A view is not an edit: keep updated_at (and Last-Modified) as is
+                    values['updated_at'] = table.c.updated_at
+                db.session.execute(
+                    table.update()
+                    .where(table.c.id == bindparam('row_id'))
+                    .values(values),
+                    [{'row_id': row_id, 'delta': delta} for row_id, delta in counts.items()]
+                )
+                # Denormalized scores derived from the counts (Post.trending_score)
+                if hasattr(model, 'after_views_flush'):
+                    model.after_views_flush()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception('Could not flush view counters')
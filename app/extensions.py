@@ -1,19 +1,43 @@
+from flask import session
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from flask_login import LoginManager
+from flask_login import LoginManager, current_user
 from flask_mail import Mail
+from flask_caching import Cache
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 mail = Mail()
+cache = Cache()
+
+def skip_page_cache():
+    """``unless`` callback for @cache.cached views: base.html renders the user
+    menu and flash messages, so only anonymous pages without flashes are cached"""
+    return current_user.is_authenticated or '_flashes' in session
 
 # Configure login manager
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Veuillez vous connecter pour accéder à cette page.'
 login_manager.login_message_category = 'info'
 
+# Rate limiting is optional (Flask-Limiter ships with the production
+# requirements); without it the @limiter.limit decorators do nothing
+try:
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+    limiter = Limiter(key_func=get_remote_address)
+except ImportError:
+    class _NoLimiter:
+        def init_app(self, app):
+            pass
+        
+        def limit(self, *args, **kwargs):
+            return lambda f: f
+    
+    limiter = _NoLimiter()
+
 # Flask-Admin will be imported separately in admin.py to handle optional dependency
 admin = None
 
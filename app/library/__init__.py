@@ -5,7 +5,8 @@ bp = Blueprint('library', __name__)
 
 # Register nl2br filter for this blueprint
 def nl2br(value):
-    return Markup('<br>'.join(escape(value).split('\n')))
+    # str() first: Markup.replace would escape the '<br>' replacement too
+    return Markup(str(escape(value)).replace('\n', '<br>'))
 
 @bp.app_template_filter('nl2br')
 def nl2br_filter(value):
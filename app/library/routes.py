@@ -1,31 +1,34 @@
 from flask import render_template, request, redirect, url_for, flash, current_app
 from app.library import bp
 from app.models import Book, Author, Publisher, BookCategory, Collection, BookReview, Tag
-from app.extensions import db
+from app.extensions import db, cache, skip_page_cache
+from app.pagination import keyset_paginate
+from app.counters import bump_views
+from app.conditional import conditional_page
 from datetime import datetime
-from sqlalchemy import desc, asc, func
+from sqlalchemy import desc, asc
+from sqlalchemy.orm import joinedload, selectinload
+
+def book_list_options():
+    """Eager loads for book cards (authors and category in O(1) queries)"""
+    return (selectinload(Book.authors), joinedload(Book.book_category))
 
 @bp.route('/')
 @bp.route('/index')
+@cache.cached(timeout=60, query_string=True, unless=skip_page_cache)
 def index():
     """Library homepage"""
-    page = request.args.get('page', 1, type=int)
-    
     # Base query for published books
-    query = Book.query.filter_by(is_published=True)
+    query = Book.query.options(*book_list_options()).filter_by(is_published=True)
     
-    # Apply sorting
-    query = query.order_by(desc(Book.created_at))
+    # Apply sorting (id breaks ties so the keyset is unique)
+    query = query.order_by(desc(Book.created_at), desc(Book.id))
     
-    # Paginate results
-    books = query.paginate(
-        page=page,
-        per_page=current_app.config.get('BOOKS_PER_PAGE', 12),
-        error_out=False
-    )
+    # Paginate results by cursor (no COUNT, no OFFSET)
+    books = keyset_paginate(query, per_page=current_app.config.get('BOOKS_PER_PAGE', 12))
     
     # Featured books for carousel (up to 12 books for 3 slides with 4 books each)
-    featured_books = Book.query.filter_by(
+    featured_books = Book.query.options(*book_list_options()).filter_by(
         is_published=True,
         is_featured=True
     ).order_by(desc(Book.created_at)).limit(12).all()
@@ -37,35 +40,46 @@ def index():
 @bp.route('/book/<slug>')
 def book_detail(slug):
     """Individual book page"""
-    book = Book.query.filter_by(slug=slug, is_published=True).first_or_404()
-    
-    # Increment view count
-    book.views += 1
-    db.session.commit()
-    
-    # Get approved reviews
-    reviews = BookReview.query.filter_by(
-        book=book,
-        is_approved=True
-    ).order_by(desc(BookReview.created_at)).all()
-    
-    # Get related books (same category or authors)
-    related_books = []
-    
-    # Books in same category
-    if book.book_category:
-        related_books = Book.query.filter(
-            Book.book_category == book.book_category,
-            Book.is_published == True,
-            Book.id != book.id
-        ).order_by(desc(Book.created_at)).limit(4).all()
-    
-    return render_template('library/book_detail.html',
-                         book=book,
-                         reviews=reviews,
-                         related_books=related_books)
+    book = Book.query.options(*book_list_options(), joinedload(Book.publisher),
+                              selectinload(Book.tags), selectinload(Book.collections)
+                              ).filter_by(slug=slug, is_published=True).first_or_404()
+    
+    # Count the visit (buffered, written in batches)
+    bump_views(Book, book.id)
+    
+    def render():
+        # Get approved reviews
+        reviews = BookReview.query.filter_by(
+            book=book,
+            is_approved=True
+        ).order_by(desc(BookReview.created_at)).all()
+        # From the loaded reviews, not Book.average_rating/review_count (3 more queries)
+        average_rating = sum(review.rating for review in reviews) / len(reviews) if reviews else 0
+        
+        # Get related books (same category or authors)
+        related_books = []
+        
+        # Books in same category
+        if book.book_category:
+            related_books = Book.query.options(*book_list_options()).filter(
+                Book.book_category == book.book_category,
+                Book.is_published == True,
+                Book.id != book.id
+            ).order_by(desc(Book.created_at)).limit(4).all()
+        
+        return render_template('library/book_detail.html',
+                             book=book,
+                             reviews=reviews,
+                             average_rating=average_rating,
+                             related_books=related_books)
+    
+    # Repeat visits of an unchanged book get a 304 without the queries above
+    # (review changes rewrite review_count/avg_rating, which bumps updated_at)
+    return conditional_page((book.id, book.updated_at, book.review_count, book.avg_rating),
+                            render, last_modified=book.updated_at)
 
 @bp.route('/authors')
+@cache.cached(timeout=60, query_string=True, unless=skip_page_cache)
 def authors():
     """Authors listing page"""
     page = request.args.get('page', 1, type=int)
@@ -90,9 +104,8 @@ def author_detail(slug):
     """Individual author page"""
     author = Author.query.filter_by(slug=slug).first_or_404()
     
-    # Increment profile views
-    author.profile_views += 1
-    db.session.commit()
+    # Count the visit (buffered, written in batches)
+    bump_views(Author, author.id, 'profile_views')
     
     # Get author's books
     books = Book.query.filter(
@@ -100,11 +113,19 @@ def author_detail(slug):
         Book.is_published == True
     ).order_by(desc(Book.publication_date)).all()
     
+    # Totals from the books already loaded (author.books would load them again)
+    stats = {
+        'total_books': len(books),
+        'total_views': sum(book.views or 0 for book in books),
+    }
+    
     return render_template('library/author_detail.html',
                          author=author,
-                         books=books)
+                         books=books,
+                         stats=stats)
 
 @bp.route('/categories')
+@cache.cached(timeout=60, query_string=True, unless=skip_page_cache)
 def categories():
     """Book categories listing"""
     categories = BookCategory.query.order_by(BookCategory.sort_order, BookCategory.name).all()
@@ -121,14 +142,12 @@ def search():
     results = {'books': None, 'authors': None}
     
     if query and len(query) >= 2:
-        # Search books
-        books_query = Book.query.filter(
+        # Search books (full-text and ranked on PostgreSQL, see Book.search)
+        matches, ranking = Book.search(query)
+        books_query = Book.query.options(*book_list_options()).filter(
             Book.is_published == True,
-            db.or_(
-                Book.title.contains(query),
-                Book.description.contains(query)
-            )
-        ).order_by(desc(Book.created_at))
+            matches
+        ).order_by(*ranking, desc(Book.created_at))
         
         results['books'] = books_query.paginate(
             page=page,
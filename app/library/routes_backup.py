@@ -1,9 +1,16 @@
 from flask import render_template, request, redirect, url_for, flash, current_app, jsonify
 from app.library import bp
 from app.models import Book, Author, Publisher, BookCategory, Collection, BookReview, Tag
-from app.extensions import db
+from app.extensions import db, cache
+from app.counters import bump_views
 from datetime import datetime
-from sqlalchemy import desc, asc, func
+from collections import Counter
+from sqlalchemy import desc, asc, func, event
+
+def _padded_ids(ids, size=4):
+    """Pad an id list with -1 to a fixed length, so the IN (...) statement text
+    is the same on every request (prepared statement / PgBouncer caching)"""
+    return list(ids) + [-1] * (size - len(ids))
 
 @bp.route('/')
 @bp.route('/index')
@@ -39,14 +46,7 @@ def index():
         query = query.filter_by(publisher=publisher)
 
     if search_query:
-        query = query.filter(
-            db.or_(
-                Book.title.contains(search_query),
-                Book.description.contains(search_query),
-                Book.abstract.contains(search_query),
-                Book.keywords.contains(search_query)
-            )
-        )
+        query = query.filter(Book.search(search_query)[0])
 
     # Apply sorting
     if sort_by == 'oldest':
@@ -54,10 +54,8 @@ def index():
     elif sort_by == 'popular':
         query = query.order_by(desc(Book.views))
     elif sort_by == 'rating':
-        # Sort by average rating (books with reviews first)
-        query = query.outerjoin(BookReview).group_by(Book.id).order_by(
-            desc(func.avg(BookReview.rating).label('avg_rating'))
-        )
+        # Stored average (see Book.avg_rating), most reviewed first on ties
+        query = query.order_by(desc(Book.avg_rating), desc(Book.review_count))
     else:  # newest (default)
         query = query.order_by(desc(Book.created_at))
 
@@ -109,9 +107,8 @@ def book_detail(slug):
     """Individual book page"""
     book = Book.query.filter_by(slug=slug, is_published=True).first_or_404()
 
-    # Increment view count
-    book.views += 1
-    db.session.commit()
+    # Count the visit (buffered, written in batches)
+    bump_views(Book, book.id)
 
     # Get approved reviews
     reviews = BookReview.query.filter_by(
@@ -119,15 +116,14 @@ def book_detail(slug):
         is_approved=True
     ).order_by(desc(BookReview.created_at)).all()
 
-    # Calculate rating breakdown
+    # Calculate rating breakdown (one pass over the reviews already loaded)
     rating_breakdown = {}
     if reviews:
-        for i in range(1, 6):
-            count = len([r for r in reviews if r.rating == i])
-            rating_breakdown[i] = {
-                'count': count,
-                'percentage': (count / len(reviews)) * 100 if reviews else 0
-            }
+        counts = Counter(review.rating for review in reviews)
+        rating_breakdown = {
+            i: {'count': counts[i], 'percentage': counts[i] * 100 / len(reviews)}
+            for i in range(1, 6)
+        }
 
     # Get related books (same category or authors)
     related_books = []
@@ -145,7 +141,7 @@ def book_detail(slug):
             Book.authors.any(Author.id.in_([a.id for a in book.authors])),
             Book.is_published == True,
             Book.id != book.id,
-            ~Book.id.in_([b.id for b in related_books])
+            ~Book.id.in_(_padded_ids([b.id for b in related_books]))
         ).order_by(desc(Book.created_at)).limit(4 - len(related_books)).all()
         related_books.extend(author_books)
 
@@ -154,7 +150,7 @@ def book_detail(slug):
         recent_books = Book.query.filter(
             Book.is_published == True,
             Book.id != book.id,
-            ~Book.id.in_([b.id for b in related_books])
+            ~Book.id.in_(_padded_ids([b.id for b in related_books]))
         ).order_by(desc(Book.created_at)).limit(4 - len(related_books)).all()
         related_books.extend(recent_books)
 
@@ -308,9 +304,8 @@ def author_detail(slug):
     """Individual author page"""
     author = Author.query.filter_by(slug=slug).first_or_404()
 
-    # Increment profile views
-    author.profile_views += 1
-    db.session.commit()
+    # Count the visit (buffered, written in batches)
+    bump_views(Author, author.id, 'profile_views')
 
     # Get author's books
     books = Book.query.filter(
@@ -318,11 +313,15 @@ def author_detail(slug):
         Book.is_published == True
     ).order_by(desc(Book.publication_date)).all()
 
-    # Get book statistics
+    # Get book statistics (review totals in one aggregate, not per book)
     total_books = len(books)
-    total_views = sum(book.views for book in books)
-    total_reviews = sum(book.review_count for book in books)
-    avg_rating = sum(book.average_rating for book in books if book.average_rating) / max(1, len([b for b in books if b.average_rating]))
+    total_views = sum(book.views or 0 for book in books)
+    total_reviews, avg_rating = db.session.query(
+        func.count(BookReview.id), func.avg(BookReview.rating)
+    ).filter(
+        BookReview.book_id.in_([book.id for book in books]),
+        BookReview.is_approved == True
+    ).one()
 
     # Get related authors (same nationality or similar works)
     related_authors = Author.query.filter(
@@ -338,7 +337,7 @@ def author_detail(slug):
             'total_books': total_books,
             'total_views': total_views,
             'total_reviews': total_reviews,
-            'avg_rating': round(avg_rating, 1) if avg_rating else 0
+            'avg_rating': round(float(avg_rating), 1) if avg_rating else 0
         },
         related_authors=related_authors
     )
@@ -383,15 +382,11 @@ def search():
 
     if query and len(query) >= 2:
         if search_type in ['all', 'books']:
+            matches, ranking = Book.search(query)
             books_query = Book.query.filter(
                 Book.is_published == True,
-                db.or_(
-                    Book.title.contains(query),
-                    Book.description.contains(query),
-                    Book.abstract.contains(query),
-                    Book.keywords.contains(query)
-                )
-            ).order_by(desc(Book.created_at))
+                matches
+            ).order_by(*ranking, desc(Book.created_at))
 
             if search_type == 'books':
                 results['books'] = books_query.paginate(
@@ -426,8 +421,34 @@ def search():
         results=results
     )
 
+SIDEBAR_CACHE_KEY = 'library_sidebar'
+
 def get_library_sidebar_data():
-    """Get common sidebar data for library pages"""
+    """Get common sidebar data for library pages (cached for 10 minutes)"""
+    data = cache.get(SIDEBAR_CACHE_KEY)
+    if data is None:
+        data = _load_library_sidebar_data()
+        cache.set(SIDEBAR_CACHE_KEY, data, timeout=600)
+
+    # Attach the cached instances to this request's session without querying
+    return {
+        'categories': [(db.session.merge(category, load=False), count) for category, count in data['categories']],
+        'collections': [db.session.merge(collection, load=False) for collection in data['collections']],
+        'popular_authors': [(db.session.merge(author, load=False), views) for author, views in data['popular_authors']],
+        'recent_books': [db.session.merge(book, load=False) for book in data['recent_books']],
+        'publishers': [db.session.merge(publisher, load=False) for publisher in data['publishers']]
+    }
+
+def _invalidate_library_sidebar(mapper, connection, target):
+    cache.delete(SIDEBAR_CACHE_KEY)
+
+# Any write to these models may change the sidebar lists and counts
+for model in (Book, Author, BookCategory, Collection, Publisher):
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, event_name, _invalidate_library_sidebar)
+
+def _load_library_sidebar_data():
+    """Run the sidebar queries"""
     # Categories with book counts
     categories = db.session.query(
         BookCategory, func.count(Book.id).label('book_count')
@@ -456,9 +477,9 @@ def get_library_sidebar_data():
     publishers = Publisher.query.filter_by(is_active=True).order_by(Publisher.name).all()
 
     return {
-        'categories': categories,
+        'categories': [tuple(row) for row in categories],
         'collections': collections,
-        'popular_authors': popular_authors,
+        'popular_authors': [tuple(row) for row in popular_authors],
         'recent_books': recent_books,
         'publishers': publishers
     }
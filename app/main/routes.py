@@ -4,23 +4,29 @@ from app.models import (
     Post, Book, Testimonial, Collection, Category, Tag, 
     ContactMessage, NewsletterSubscriber, Author, LibraryStats, PresidentMessage, CommunicationCompany
 )
-from app.extensions import db
+from app.extensions import db, cache, skip_page_cache
+from sqlalchemy.orm import defer, selectinload, load_only
 from datetime import datetime
 import re
+from xml.sax.saxutils import escape as xml_escape
 
 @bp.route('/')
 @bp.route('/index')
+@cache.cached(timeout=60, unless=skip_page_cache)
 def index():
     """Homepage with featured content"""
-    # Featured posts
-    featured_posts = Post.query.filter_by(published=True, is_featured=True).order_by(Post.published_at.desc()).limit(3).all()
+    # Featured posts (cards only need the stored excerpt, not the content)
+    featured_posts = Post.query.options(defer(Post.content)).filter_by(published=True, is_featured=True).order_by(Post.published_at.desc()).limit(3).all()
     
     # Recent posts if no featured posts
     if not featured_posts:
-        featured_posts = Post.query.filter_by(published=True).order_by(Post.published_at.desc()).limit(3).all()
+        featured_posts = Post.query.options(defer(Post.content)).filter_by(published=True).order_by(Post.published_at.desc()).limit(3).all()
     
-    # Featured books
-    featured_books = Book.query.filter_by(is_published=True, is_featured=True).order_by(Book.created_at.desc()).limit(6).all()
+    # Featured books (only the card columns, authors in one extra query)
+    featured_books = Book.query.options(
+        load_only(Book.slug, Book.title, Book.cover_image, Book.price, Book.currency),
+        selectinload(Book.authors).load_only(Author.name)
+    ).filter_by(is_published=True, is_featured=True).order_by(Book.created_at.desc()).limit(6).all()
     
     # Featured testimonials
     featured_testimonials = Testimonial.query.filter_by(
@@ -59,7 +65,9 @@ def about():
         library_stats = LibraryStats.update_stats()
     
     # Recent achievements or milestones
-    recent_books = Book.query.filter_by(is_published=True).order_by(Book.created_at.desc()).limit(5).all()
+    recent_books = Book.query.options(
+        load_only(Book.slug, Book.title, Book.cover_image, Book.created_at)
+    ).filter_by(is_published=True).order_by(Book.created_at.desc()).limit(5).all()
     
     # President's message
     president_message = PresidentMessage.get_active_message()
@@ -121,6 +129,7 @@ def contact():
     return render_template('main/contact.html')
 
 @bp.route('/collections')
+@cache.cached(timeout=60, unless=skip_page_cache)
 def collections():
     """Collections overview page"""
     # Get all collections with their book counts
@@ -139,7 +148,7 @@ def collection_detail(slug):
     collection = Collection.query.filter_by(slug=slug).first_or_404()
     
     # Get books in this collection
-    books = Book.query.filter(
+    books = Book.query.options(selectinload(Book.authors)).filter(
         Book.collections.contains(collection),
         Book.is_published == True
     ).order_by(Book.created_at.desc()).all()
@@ -176,26 +185,19 @@ def search():
     }
     
     if len(query) >= 2:  # Minimum search length
-        # Search posts
+        # Search posts (full-text and ranked on PostgreSQL, see Post.search)
+        matches, ranking = Post.search(query)
         results['posts'] = Post.query.filter(
             Post.published == True,
-            db.or_(
-                Post.title.contains(query),
-                Post.content.contains(query),
-                Post.excerpt.contains(query)
-            )
-        ).order_by(Post.published_at.desc()).limit(10).all()
+            matches
+        ).order_by(*ranking, Post.published_at.desc()).limit(10).all()
         
         # Search books
+        matches, ranking = Book.search(query)
         results['books'] = Book.query.filter(
             Book.is_published == True,
-            db.or_(
-                Book.title.contains(query),
-                Book.description.contains(query),
-                Book.abstract.contains(query),
-                Book.keywords.contains(query)
-            )
-        ).order_by(Book.created_at.desc()).limit(10).all()
+            matches
+        ).order_by(*ranking, Book.created_at.desc()).limit(10).all()
         
         # Search authors
         results['authors'] = Author.query.filter(
@@ -257,71 +259,67 @@ def newsletter_subscribe():
         return jsonify({'success': False, 'message': 'Une erreur est survenue'})
 
 @bp.route('/sitemap.xml')
+@cache.cached(timeout=3600, key_prefix='sitemap_xml')
 def sitemap():
-    """Generate sitemap"""
+    """Generate sitemap (cached for an hour, built from slug/date columns only)"""
     from flask import Response
     
-    # Get all public URLs
-    urls = []
-    
-    # Static pages
-    static_pages = [
-        ('main.index', '1.0', 'daily'),
-        ('main.about', '0.8', 'monthly'),
-        ('main.contact', '0.6', 'monthly'),
-        ('main.collections', '0.8', 'weekly'),
-        ('blog.index', '0.9', 'daily'),
-        ('library.index', '0.9', 'weekly'),
-        ('testimonials.index', '0.7', 'monthly')
-    ]
-    
-    for route, priority, changefreq in static_pages:
-        urls.append({
-            'loc': url_for(route, _external=True),
-            'priority': priority,
-            'changefreq': changefreq,
-            'lastmod': datetime.utcnow().strftime('%Y-%m-%d')
-        })
-    
-    # Dynamic content
-    # Blog posts
-    posts = Post.query.filter_by(published=True).all()
-    for post in posts:
-        urls.append({
-            'loc': url_for('blog.post_detail', slug=post.slug, _external=True),
-            'priority': '0.7',
-            'changefreq': 'monthly',
-            'lastmod': post.updated_at.strftime('%Y-%m-%d') if post.updated_at else post.created_at.strftime('%Y-%m-%d')
-        })
-    
-    # Books
-    books = Book.query.filter_by(is_published=True).all()
-    for book in books:
-        urls.append({
-            'loc': url_for('library.book_detail', slug=book.slug, _external=True),
-            'priority': '0.8',
-            'changefreq': 'monthly',
-            'lastmod': book.updated_at.strftime('%Y-%m-%d') if book.updated_at else book.created_at.strftime('%Y-%m-%d')
-        })
+    def url_entry(loc, lastmod, changefreq, priority):
+        lastmod = f'<lastmod>{lastmod:%Y-%m-%d}</lastmod>' if lastmod else ''
+        return (f'  <url><loc>{xml_escape(loc)}</loc>{lastmod}'
+                f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n')
     
-    # Collections
-    collections = Collection.query.all()
-    for collection in collections:
-        urls.append({
-            'loc': url_for('main.collection_detail', slug=collection.slug, _external=True),
-            'priority': '0.7',
-            'changefreq': 'monthly',
-            'lastmod': collection.created_at.strftime('%Y-%m-%d')
-        })
+    def generate():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        
+        # Static pages
+        static_pages = [
+            ('main.index', '1.0', 'daily'),
+            ('main.about', '0.8', 'monthly'),
+            ('main.contact', '0.6', 'monthly'),
+            ('main.collections', '0.8', 'weekly'),
+            ('blog.index', '0.9', 'daily'),
+            ('library.index', '0.9', 'weekly'),
+            ('testimonials.index', '0.7', 'monthly')
+        ]
+        today = datetime.utcnow()
+        for route, priority, changefreq in static_pages:
+            yield url_entry(url_for(route, _external=True), today, changefreq, priority)
+        
+        # Dynamic content, streamed from the database in batches
+        # Blog posts
+        posts = db.session.query(Post.slug, Post.updated_at, Post.created_at).filter(
+            Post.published == True
+        ).yield_per(500)
+        for slug, updated_at, created_at in posts:
+            yield url_entry(url_for('blog.post_detail', slug=slug, _external=True),
+                            updated_at or created_at, 'monthly', '0.7')
+        
+        # Books
+        books = db.session.query(Book.slug, Book.updated_at, Book.created_at).filter(
+            Book.is_published == True
+        ).yield_per(500)
+        for slug, updated_at, created_at in books:
+            yield url_entry(url_for('library.book_detail', slug=slug, _external=True),
+                            updated_at or created_at, 'monthly', '0.8')
+        
+        # Collections
+        for slug, created_at in db.session.query(Collection.slug, Collection.created_at):
+            yield url_entry(url_for('main.collection_detail', slug=slug, _external=True),
+                            created_at, 'monthly', '0.7')
+        
+        yield '</urlset>\n'
     
-    # Generate XML
-    xml = render_template('sitemap.xml', urls=urls)
-    return Response(xml, mimetype='application/xml')
+    # Joined rather than streamed, so the whole document can be cached
+    return Response(''.join(generate()), mimetype='application/xml')
+
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 
 def is_valid_email(email):
     """Simple email validation"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return EMAIL_RE.match(email) is not None
 
 # Error handlers
 @bp.errorhandler(404)
@@ -336,8 +334,11 @@ def internal_error(error):
 
 @bp.route('/edition')
 def edition():
-    books = Book.query.filter_by(is_published=True).all()
-    authors = Author.query.all()
+    books = Book.query.options(
+        load_only(Book.slug, Book.title, Book.cover_image, Book.description),
+        selectinload(Book.authors).load_only(Author.name)
+    ).filter_by(is_published=True).all()
+    authors = Author.query.options(load_only(Author.name, Author.nationality, Author.photo)).all()
     return render_template('main/edition.html', books=books, authors=authors)
 
 @bp.route('/communication')
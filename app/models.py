@@ -1,9 +1,39 @@
 from datetime import datetime, timedelta
+import re
+import math
 import secrets
-from app.extensions import db
+import hashlib
+from markupsafe import Markup
+from sqlalchemy import event
+from app.extensions import db, cache
 from slugify import slugify
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
+from flask import current_app
+
+def estimate_cache_key(model):
+    return f'admin_estimate_{model.__table__.name}'
+
+def estimated_count(model):
+    """Approximate row count of a whole table, cached for 5 minutes.
+
+    PostgreSQL answers from the planner statistics (pg_class.reltuples)
+    instead of scanning the table; other databases, and tables that have
+    never been analysed, fall back to COUNT(*).
+    """
+    key = estimate_cache_key(model)
+    total = cache.get(key)
+    if total is None:
+        total = -1
+        if db.engine.dialect.name == 'postgresql':
+            total = db.session.execute(
+                db.text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+                {'name': model.__table__.name}
+            ).scalar() or -1
+        if total < 0:
+            total = db.session.query(db.func.count()).select_from(model).scalar()
+        cache.set(key, total, timeout=300)
+    return total
 
 # Association tables for many-to-many relationships
 book_authors = db.Table('book_authors',
@@ -54,6 +84,26 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    @classmethod
+    def get_cached(cls, user_id):
+        """Load a user for Flask-Login, cached to avoid a SELECT per request.
+
+        Every login, profile or privilege change calls forget_cached(), so the
+        timeout only bounds changes made outside the app (e.g. from a shell).
+        """
+        user = cache.get(f'user:{user_id}')
+        if user is None:
+            user = db.session.get(cls, int(user_id))
+            if user is not None:
+                cache.set(f'user:{user_id}', user, timeout=300)
+            return user
+        # Attach the cached copy to this request's session without querying
+        return db.session.merge(user, load=False)
+    
+    def forget_cached(self):
+        """Drop the cached copy after login state or privileges change"""
+        cache.delete(f'user:{self.id}')
+    
     @property
     def full_name(self):
         if self.first_name and self.last_name:
@@ -90,6 +140,19 @@ class Category(db.Model):
     def post_count(self):
         return self.posts.filter_by(published=True).count()
     
+    @classmethod
+    def get_cached_list(cls):
+        """id, name, slug and published post_count of every category, cached for 5 minutes"""
+        categories = cache.get('blog_categories')
+        if categories is None:
+            rows = db.session.query(
+                cls.id, cls.name, cls.slug, db.func.count(Post.id).label('post_count')
+            ).outerjoin(Post, db.and_(Post.category_id == cls.id, Post.published == True)
+            ).group_by(cls.id, cls.name, cls.slug).order_by(cls.name).all()
+            categories = [row._asdict() for row in rows]
+            cache.set('blog_categories', categories, timeout=300)
+        return categories
+    
     def __repr__(self):
         return f'<Category {self.name}>'
 
@@ -149,6 +212,7 @@ class Post(db.Model):
     meta_description = db.Column(db.String(500))
     featured_image = db.Column(db.String(255))
     reading_time = db.Column(db.Integer)  # in minutes
+    word_count = db.Column(db.Integer)  # reading_time, word_count and default excerpt: see _post_content_changed
     
     # Status and visibility
     published = db.Column(db.Boolean, default=False)
@@ -159,36 +223,54 @@ class Post(db.Model):
     # Analytics
     views = db.Column(db.Integer, default=0)
     likes = db.Column(db.Integer, default=0)
+    # Views decayed by age, see refresh_trending_scores
+    trending_score = db.Column(db.Float, nullable=False, default=0, server_default='0')
+    # Approved comments, kept up to date by the Comment events below
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = db.Column(db.DateTime)
+    # 'YYYY-MM' of published_at for archive grouping, kept in sync by the events below
+    published_ym = db.Column(db.String(7))
     
     # Foreign Keys
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
-    
+    # Copy of author.full_name for listings, kept in sync by the events below
+    author_display_name = db.Column(db.String(130))
+
+    # Indexes (views totals and top published posts are served from the index)
+    __table_args__ = (
+        db.Index('ix_post_views', views),
+        db.Index('ix_post_published_views', views.desc(),
+                 postgresql_where=published.is_(True),
+                 sqlite_where=published.is_(True)),
+        db.Index('ix_post_created_views', created_at.desc(), views.desc()),
+        db.Index('ix_post_published_created', published, created_at),
+        # Latest published posts
+        db.Index('ix_post_pub_id', published, published_at.desc(), id.desc()),
+        # Keyset pagination of the blog listings, see listing_order
+        db.Index('ix_post_pub_date', published, db.func.coalesce(published_at, created_at).desc(), id.desc()),
+        # Archive months (group/filter on the stored month, not strftime)
+        db.Index('ix_post_ym', published_ym, published),
+        # Home page featured posts (partial: only published featured rows)
+        db.Index('ix_post_featured', is_featured, published_at.desc(),
+                 postgresql_where=db.and_(published.is_(True), is_featured.is_(True)),
+                 sqlite_where=db.and_(published.is_(True), is_featured.is_(True))),
+        # Popular posts strip
+        db.Index('ix_post_trending', published, trending_score.desc()),
+    )
+
     # Relationships
-    comments = db.relationship('Comment', backref='post', lazy='dynamic', cascade='all, delete-orphan')
+    # active_history keeps the previous post around when a comment is moved,
+    # so its comment_count can be decremented. Comments are removed with the
+    # post by ON DELETE CASCADE (or a bulk DELETE), never loaded one by one
+    comments = db.relationship('Comment', backref=db.backref('post', active_history=True),
+                               lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
     tags = db.relationship('Tag', secondary=post_tags, backref='posts')
     
-    def __init__(self, **kwargs):
-        super(Post, self).__init__(**kwargs)
-        if not self.slug:
-            self.slug = slugify(self.title)
-        if not self.excerpt and self.content:
-            # Auto-generate excerpt from content (first 200 chars)
-            self.excerpt = self.content[:200] + '...' if len(self.content) > 200 else self.content
-        if not self.reading_time and self.content:
-            # Estimate reading time (average 200 words per minute)
-            word_count = len(self.content.split())
-            self.reading_time = max(1, round(word_count / 200))
-    
-    @property
-    def comment_count(self):
-        return self.comments.filter_by(approved=True).count()
-    
     @property
     def tag_names(self):
         return [tag.name for tag in self.tags]
@@ -204,6 +286,83 @@ class Post(db.Model):
             return f"{self.reading_time} min de lecture"
         return "< 1 min de lecture"
     
+    @classmethod
+    def recount_comments(cls, post_ids=None):
+        """Recompute comment_count for every post, or only for ``post_ids``
+        (backfill/repair, and after bulk comment updates that skip the events)"""
+        approved = db.session.query(db.func.count(Comment.id)).filter(
+            Comment.post_id == cls.id, Comment.approved == True
+        ).scalar_subquery()
+        query = cls.query
+        if post_ids is not None:
+            query = query.filter(cls.id.in_(post_ids))
+        query.update({cls.comment_count: approved}, synchronize_session=False)
+    
+    @classmethod
+    def search(cls, query):
+        """``(filter, ordering)`` matching ``query``, see text_search"""
+        return text_search(cls, query, cls.title, cls.excerpt, cls.content)
+    
+    @classmethod
+    def listing_order(cls):
+        """Newest first on a non-null unique key, for keyset pagination
+
+        published_at is NULL on posts published without publish(), and a NULL
+        bookmark would make every following page empty.
+        """
+        listing_date = db.func.coalesce(cls.published_at, cls.created_at).label('listing_date')
+        return listing_date.desc(), cls.id.desc()
+    
+    @classmethod
+    def sync_author_display_names(cls):
+        """Recompute author_display_name for every post (backfill/repair)"""
+        name = db.session.query(_full_name_sql()).filter(User.id == cls.author_id).scalar_subquery()
+        cls.query.update({cls.author_display_name: name}, synchronize_session=False)
+    
+    TRENDING_WINDOW_DAYS = 60
+    TRENDING_HALF_LIFE_DAYS = 7  # decay constant: views * exp(-age / 7 days)
+    _trending_refreshed_at = None
+    
+    @classmethod
+    def refresh_trending_scores(cls):
+        """Recompute trending_score of the posts published in the last 60 days
+        and reset older ones (computed here, SQLite has no exp())"""
+        now = datetime.utcnow()
+        since = now - timedelta(days=cls.TRENDING_WINDOW_DAYS)
+        rows = db.session.query(cls.id, cls.views, cls.published_at).filter(
+            cls.published == True, cls.published_at >= since
+        ).all()
+        if rows:
+            db.session.execute(db.update(cls).execution_options(synchronize_session=False), [
+                {'id': id, 'trending_score': (views or 0) * math.exp(
+                    -(now - published_at).total_seconds() / 86400 / cls.TRENDING_HALF_LIFE_DAYS)}
+                for id, views, published_at in rows
+            ])
+        cls.query.filter(
+            cls.trending_score > 0,
+            db.or_(cls.published == False, cls.published_at < since, cls.published_at.is_(None))
+        ).update({cls.trending_score: 0}, synchronize_session=False)
+    
+    @classmethod
+    def after_views_flush(cls):
+        """Called by app.counters after buffered views are written: refresh
+        trending scores at most every TRENDING_REFRESH_INTERVAL seconds"""
+        interval = current_app.config.get('TRENDING_REFRESH_INTERVAL', 300)
+        if cls._trending_refreshed_at and (datetime.utcnow() - cls._trending_refreshed_at).total_seconds() < interval:
+            return
+        cls._trending_refreshed_at = datetime.utcnow()
+        cls.refresh_trending_scores()
+    
+    @classmethod
+    def sync_published_months(cls):
+        """Recompute published_ym for every post (backfill/repair)"""
+        rows = db.session.query(cls.id, cls.published_at).all()
+        if rows:
+            db.session.execute(db.update(cls), [
+                {'id': id, 'published_ym': published_at.strftime('%Y-%m') if published_at else None}
+                for id, published_at in rows
+            ])
+    
     def publish(self):
         if not self.published:
             self.published = True
@@ -234,7 +393,8 @@ class Comment(db.Model):
     email = db.Column(db.String(120))  # For anonymous comments
     website = db.Column(db.String(255))
     ip_address = db.Column(db.String(45))
-    user_agent = db.Column(db.String(500))
+    user_agent = db.Column(db.String(120))  # Truncated, see _comment_user_agent
+    ua_hash = db.Column(db.BigInteger, index=True)  # Fingerprint of the full User-Agent
     
     # Status
     approved = db.Column(db.Boolean, default=False)
@@ -245,10 +405,19 @@ class Comment(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign Keys
-    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
+    post_id = db.column_property(db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), nullable=False),
+                                 active_history=True)  # see _comment_updated
     author_id = db.Column(db.Integer, db.ForeignKey('user.id'))  # For registered users
     parent_id = db.Column(db.Integer, db.ForeignKey('comment.id'))  # For replies
     
+    __table_args__ = (
+        db.Index('ix_comment_created_id', created_at.desc(), id.desc()),
+        # Approved comments of a post in display order (also serves post_id lookups)
+        db.Index('ix_comment_post_created', 'post_id', approved, created_at),
+        # Admin moderation tabs (pending / approved / spam)
+        db.Index('ix_comment_status', approved, is_spam, created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
     
@@ -274,6 +443,131 @@ class Comment(db.Model):
     def __repr__(self):
         return f'<Comment by {self.commenter_name}>'
 
+def _full_name_sql():
+    """SQL equivalent of User.full_name"""
+    user = User.__table__.c
+    return db.case(
+        (db.and_(db.func.coalesce(user.first_name, '') != '', db.func.coalesce(user.last_name, '') != ''),
+         user.first_name + ' ' + user.last_name),
+        else_=user.username
+    )
+
+@event.listens_for(Post, 'before_insert')
+@event.listens_for(Post, 'before_update')
+def _post_author_changed(mapper, connection, target):
+    if target.author_display_name is None or db.inspect(target).attrs.author_id.history.has_changes():
+        target.author_display_name = connection.scalar(
+            db.select(_full_name_sql()).where(User.__table__.c.id == target.author_id)
+        )
+
+@event.listens_for(Post, 'before_insert')
+@event.listens_for(Post, 'before_update')
+def _post_content_changed(mapper, connection, target):
+    # Word count, reading time and default excerpt are computed once per write,
+    # not on every render
+    state = db.inspect(target)
+    if 'content' in state.unloaded or not target.content:
+        return
+    if target.word_count is not None and not state.attrs.content.history.has_changes():
+        return
+    text = Markup(target.content).striptags()
+    target.word_count = len(re.findall(r'\w+', text))
+    target.reading_time = max(1, round(target.word_count / 200))  # 200 words per minute
+    if not target.excerpt:
+        target.excerpt = text[:150].rsplit(' ', 1)[0] + '...' if len(text) > 150 else text
+
+@event.listens_for(Post, 'before_insert')
+@event.listens_for(Post, 'before_update')
+def _post_published_month(mapper, connection, target):
+    if 'published_at' in db.inspect(target).unloaded:
+        return
+    target.published_ym = target.published_at.strftime('%Y-%m') if target.published_at else None
+
+@event.listens_for(User, 'after_update')
+def _user_renamed(mapper, connection, target):
+    # Re-sync the copies on the user's posts when the display name changes
+    state = db.inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ('first_name', 'last_name', 'username')):
+        connection.execute(
+            Post.__table__.update()
+            .where(Post.__table__.c.author_id == target.id)
+            .values(author_display_name=target.full_name)
+        )
+
+def user_agent_hash(user_agent):
+    """Signed 64-bit fingerprint of a User-Agent string (fits a BIGINT)"""
+    if not user_agent:
+        return None
+    return int.from_bytes(hashlib.blake2b(user_agent.encode(), digest_size=8).digest(), 'big', signed=True)
+
+@event.listens_for(Comment, 'before_insert')
+def _comment_user_agent(mapper, connection, target):
+    # Keep comment rows small: a short UA prefix for display, the hash for matching
+    if target.user_agent:
+        if target.ua_hash is None:
+            target.ua_hash = user_agent_hash(target.user_agent)
+        target.user_agent = target.user_agent[:120]
+
+def _bump_comment_count(connection, post_id, delta):
+    connection.execute(
+        Post.__table__.update()
+        .where(Post.__table__.c.id == post_id)
+        .values(comment_count=Post.__table__.c.comment_count + delta)
+    )
+
+@event.listens_for(Comment, 'after_insert')
+def _comment_inserted(mapper, connection, target):
+    if target.approved:
+        _bump_comment_count(connection, target.post_id, 1)
+
+@event.listens_for(Comment, 'after_delete')
+def _comment_deleted(mapper, connection, target):
+    if target.approved:
+        _bump_comment_count(connection, target.post_id, -1)
+
+@event.listens_for(Comment, 'after_update')
+def _comment_updated(mapper, connection, target):
+    # Only approval changes or moves to another post affect the counters
+    state = db.inspect(target)
+    approved_history = state.attrs.approved.history
+    was_approved = approved_history.deleted[0] if approved_history.deleted else target.approved
+    old_post_id = target.post_id
+    post_id_history = state.attrs.post_id.history
+    post_history = state.attrs.post.history
+    if post_id_history.deleted and post_id_history.deleted[0] is not None:
+        old_post_id = post_id_history.deleted[0]
+    elif post_history.deleted and post_history.deleted[0] is not None:
+        old_post_id = post_history.deleted[0].id
+    if (was_approved, old_post_id) == (target.approved, target.post_id):
+        return
+    if was_approved:
+        _bump_comment_count(connection, old_post_id, -1)
+    if target.approved:
+        _bump_comment_count(connection, target.post_id, 1)
+
+# Full-text search (PostgreSQL only): a generated, weighted tsvector with a GIN
+# index. Other backends keep the LIKE search in blog.search.
+def text_search(model, query, *like_columns):
+    """``(filter, ordering)`` for a text search on ``model``: the GIN-indexed
+    search_vector, best ts_rank_cd first, on PostgreSQL; LIKE on ``like_columns``
+    (and no ordering) on other backends"""
+    if db.engine.name == 'postgresql':
+        vector = db.literal_column(f'{model.__table__.name}.search_vector')
+        tsquery = db.func.websearch_to_tsquery('french', query)
+        return vector.op('@@')(tsquery), [db.func.ts_rank_cd(vector, tsquery).desc()]
+    return db.or_(*(column.contains(query) for column in like_columns)), []
+
+POST_SEARCH_DDL = (
+    """ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(excerpt, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(content, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_post_fts ON post USING GIN (search_vector)",
+)
+for _statement in POST_SEARCH_DDL:
+    event.listen(Post.__table__, 'after_create', db.DDL(_statement).execute_if(dialect='postgresql'))
+
 class ContactMessage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -468,6 +762,9 @@ class Book(db.Model):
     # Analytics
     views = db.Column(db.Integer, default=0)
     download_count = db.Column(db.Integer, default=0)
+    # Approved reviews and their mean rating, kept up to date by the BookReview events below
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    avg_rating = db.Column(db.Numeric(3, 2), nullable=False, default=0, server_default='0')
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -476,7 +773,19 @@ class Book(db.Model):
     # Foreign Keys
     publisher_id = db.Column(db.Integer, db.ForeignKey('publisher.id'))
     book_category_id = db.Column(db.Integer, db.ForeignKey('book_category.id'))
-    
+
+    # Indexes (recent popular books and the featured list are index range scans)
+    __table_args__ = (
+        db.Index('ix_book_created_views', created_at.desc(), views.desc()),
+        db.Index('ix_book_pub_feat_created', is_published, is_featured, created_at),
+        # Keyset pagination of the library listing
+        db.Index('ix_book_pub_created_id', is_published, created_at.desc(), id.desc()),
+        # Best rated first (sort=rating)
+        db.Index('ix_book_rating', avg_rating.desc(), review_count.desc(),
+                 postgresql_where=is_published.is_(True),
+                 sqlite_where=is_published.is_(True)),
+    )
+
     # Relationships
     authors = db.relationship('Author', secondary=book_authors, back_populates='books')
     tags = db.relationship('Tag', secondary=book_tags, backref='books')
@@ -506,15 +815,23 @@ class Book(db.Model):
     def author_names(self):
         return ", ".join([author.name for author in self.authors])
     
+    @classmethod
+    def search(cls, query):
+        """``(filter, ordering)`` matching ``query``, see text_search"""
+        return text_search(cls, query, cls.title, cls.subtitle, cls.description, cls.abstract, cls.keywords)
+    
     @property
     def average_rating(self):
-        if self.reviews.count() == 0:
-            return 0
-        return sum([review.rating for review in self.reviews if review.is_approved]) / self.reviews.filter_by(is_approved=True).count()
+        return float(self.avg_rating or 0)
     
-    @property
-    def review_count(self):
-        return self.reviews.filter_by(is_approved=True).count()
+    @classmethod
+    def recount_reviews(cls, book_ids=None):
+        """Recompute review_count and avg_rating for every book, or only for
+        ``book_ids`` (backfill/repair, and after bulk review updates)"""
+        query = cls.query
+        if book_ids is not None:
+            query = query.filter(cls.id.in_(book_ids))
+        query.update(_book_review_stats(cls.__table__.c.id), synchronize_session=False)
     
     @property
     def reading_time_estimate(self):
@@ -529,6 +846,20 @@ class Book(db.Model):
                 return f"{remaining_minutes}min"
         return None
 
+# Full-text search (PostgreSQL only), same scheme as POST_SEARCH_DDL; other
+# backends fall back to LIKE (see text_search)
+BOOK_SEARCH_DDL = (
+    """ALTER TABLE book ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(subtitle, '') || ' ' || coalesce(keywords, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(description, '')), 'C') ||
+        setweight(to_tsvector('french', coalesce(abstract, '')), 'D')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_book_fts ON book USING GIN (search_vector)",
+)
+for _statement in BOOK_SEARCH_DDL:
+    event.listen(Book.__table__, 'after_create', db.DDL(_statement).execute_if(dialect='postgresql'))
+
 class BookReview(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     reviewer_name = db.Column(db.String(100), nullable=False)
@@ -553,6 +884,33 @@ class BookReview(db.Model):
     # Foreign Keys
     book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
 
+def _book_review_stats(book_id):
+    """review_count/avg_rating values over the approved reviews of ``book_id``"""
+    review = BookReview.__table__.c
+    approved = db.and_(review.book_id == book_id, review.is_approved.is_(True))
+    return {
+        'review_count': db.select(db.func.count()).where(approved).scalar_subquery(),
+        'avg_rating': db.select(db.func.coalesce(db.func.avg(review.rating), 0)).where(approved).scalar_subquery(),
+    }
+
+def _refresh_book_rating(connection, book_id):
+    if book_id is not None:
+        book = Book.__table__
+        connection.execute(book.update().where(book.c.id == book_id).values(_book_review_stats(book.c.id)))
+
+@event.listens_for(BookReview, 'after_insert')
+@event.listens_for(BookReview, 'after_delete')
+def _book_review_changed(mapper, connection, target):
+    _refresh_book_rating(connection, target.book_id)
+
+@event.listens_for(BookReview, 'after_update')
+def _book_review_updated(mapper, connection, target):
+    # Recomputed (not incremented) so approvals, rating edits and moves are all covered
+    book_id_history = db.inspect(target).attrs.book_id.history
+    for old_book_id in book_id_history.deleted:
+        _refresh_book_rating(connection, old_book_id)
+    _refresh_book_rating(connection, target.book_id)
+
 class Testimonial(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     quote = db.Column(db.Text, nullable=False)
@@ -587,6 +945,11 @@ class Testimonial(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     approved_at = db.Column(db.DateTime)
     
+    # Indexes (status-filtered lists ordered by date)
+    __table_args__ = (
+        db.Index('ix_testimonial_active_created', is_active, created_at),
+    )
+    
     # Relationships
     book = db.relationship('Book', backref='testimonials')
     collection = db.relationship('Collection', backref='testimonials')
@@ -696,6 +1059,10 @@ class AdminActionLog(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     details = db.Column(db.Text)
 
+    __table_args__ = (
+        db.Index('ix_admin_action_log_timestamp_id', timestamp.desc(), id.desc()),
+    )
+
     performed_by = db.relationship('User', foreign_keys=[performed_by_id], backref='admin_actions_performed')
     target_user = db.relationship('User', foreign_keys=[target_user_id], backref='admin_actions_received')
 
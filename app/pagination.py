@@ -0,0 +1,30 @@
+from flask import request
+from sqlakeyset import get_page, BadBookmark
+
+
+class KeysetPagination:
+    """A page of results with bookmarks to its neighbours (no OFFSET, no COUNT)"""
+
+    def __init__(self, page):
+        paging = page.paging
+        self.items = list(page)
+        self.has_next = paging.has_next
+        self.has_prev = paging.has_previous
+        self.next_cursor = paging.bookmark_next if paging.has_next else None
+        self.prev_cursor = paging.bookmark_previous if paging.has_previous else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def keyset_paginate(query, per_page=20):
+    """Paginate a query by the ``cursor`` request arg.
+
+    The query must be ordered on a unique key (e.g. ``created_at, id``).
+    An invalid cursor falls back to the first page.
+    """
+    try:
+        page = get_page(query, per_page=per_page, page=request.args.get('cursor') or None)
+    except BadBookmark:
+        page = get_page(query, per_page=per_page)
+    return KeysetPagination(page)
@@ -2,8 +2,8 @@ from flask import render_template, request, flash, redirect, url_for, current_ap
 from app.testimonials import bp
 from app.models import Testimonial, Book, Collection
 from app.extensions import db
+from app.main.routes import is_valid_email
 from datetime import datetime
-import re
 import os
 import uuid
 from werkzeug.utils import secure_filename
@@ -165,11 +165,6 @@ def submit():
     
     return render_template('testimonials/submit.html')
 
-def is_valid_email(email):
-    """Simple email validation"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
 # Testimonials-specific template filters
 @bp.app_template_filter('testimonial_excerpt')
 def testimonial_excerpt_filter(text, length=100):
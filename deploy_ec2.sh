@@ -53,6 +53,7 @@ print_info "Step 2: Installing Python and development tools..."
 sudo apt install -y python3 python3-pip python3-venv python3-dev
 sudo apt install -y build-essential libssl-dev libffi-dev
 sudo apt install -y libpq-dev  # PostgreSQL development headers
+sudo apt install -y libjpeg-turbo8-dev zlib1g-dev  # Pillow-SIMD build dependencies
 print_status "Python environment ready"
 
 # Step 3: Install PostgreSQL
@@ -101,6 +102,8 @@ print_info "Step 8: Setting up Python virtual environment..."
 python3 -m venv venv
 source venv/bin/activate
 pip install --upgrade pip
+# Pillow-SIMD is compiled from source: enable AVX2 when the CPU supports it
+if grep -q avx2 /proc/cpuinfo; then export CC="cc -mavx2"; fi
 pip install -r requirements-production.txt
 print_status "Python dependencies installed"
 
@@ -198,10 +201,13 @@ server {
         log_not_found off; 
     }
 
-    # Static files with caching
+    # Static files with caching (URLs carry a ?v= fingerprint, so they can
+    # be cached for a year)
     location /static/ {
         root /home/ubuntu/ElmaGroup/app;
-        expires 30d;
+        sendfile on;
+        tcp_nopush on;
+        expires 1y;
         add_header Cache-Control "public, immutable";
         
         # Gzip compression
@@ -211,9 +217,12 @@ server {
         gzip_types text/css application/javascript image/svg+xml;
     }
 
-    # Upload files
-    location /uploads/ {
+    # Uploaded images (stored as /static/uploads/... with unique file names):
+    # served straight from disk with sendfile, never proxied to gunicorn
+    location /static/uploads/ {
         alias /home/ubuntu/ElmaGroup/app/static/uploads/;
+        sendfile on;
+        tcp_nopush on;
         expires 30d;
         add_header Cache-Control "public, immutable";
     }
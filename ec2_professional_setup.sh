@@ -22,6 +22,8 @@ sudo apt install -y \
     python3-venv \
     python3-dev \
     libpq-dev \
+    libjpeg-turbo8-dev \
+    zlib1g-dev \
     build-essential \
     curl \
     wget \
@@ -62,7 +64,10 @@ sudo -u elmagroup git clone https://github.com/diopnaby/ElmaGroup.git .
 echo "🐍 Setting up Python environment..."
 sudo -u elmagroup python3 -m venv venv
 sudo -u elmagroup /var/www/elmagroup/venv/bin/pip install --upgrade pip
-sudo -u elmagroup /var/www/elmagroup/venv/bin/pip install -r requirements-production.txt
+# Pillow-SIMD is compiled from source: enable AVX2 when the CPU supports it
+PILLOW_CC="cc"
+if grep -q avx2 /proc/cpuinfo; then PILLOW_CC="cc -mavx2"; fi
+sudo -u elmagroup CC="$PILLOW_CC" /var/www/elmagroup/venv/bin/pip install -r requirements-production.txt
 
 # Configure PostgreSQL
 echo "🗄️ Setting up PostgreSQL database..."
@@ -130,8 +135,20 @@ server {
 
     location = /favicon.ico { access_log off; log_not_found off; }
     
+    # Static files (URLs carry a ?v= fingerprint, so they can be cached for a year)
     location /static/ {
         root /var/www/elmagroup/app;
+        sendfile on;
+        tcp_nopush on;
+        expires 1y;
+        add_header Cache-Control "public, immutable";
+    }
+
+    # Uploaded images: served straight from disk with sendfile
+    location /static/uploads/ {
+        alias /var/www/elmagroup/app/static/uploads/;
+        sendfile on;
+        tcp_nopush on;
         expires 30d;
         add_header Cache-Control "public, immutable";
     }
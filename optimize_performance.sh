@@ -436,6 +436,91 @@ CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_posts_author_id ON posts(author_id);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_posts_published ON posts(created_at DESC) WHERE published = true;
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_posts_category ON posts(category);
 
+-- Blog and library full-text search (same as POST_SEARCH_DDL / BOOK_SEARCH_DDL in app/models.py, for existing databases)
+ALTER TABLE post ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('french', coalesce(excerpt, '')), 'B') ||
+    setweight(to_tsvector('french', coalesce(content, '')), 'C')
+) STORED;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_fts ON post USING GIN (search_vector);
+DO $$
+BEGIN
+    -- Rebuild the book vector once if it predates the keywords/abstract fields
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'book' AND column_name = 'search_vector'
+                 AND generation_expression NOT LIKE '%keywords%') THEN
+        ALTER TABLE book DROP COLUMN search_vector;
+    END IF;
+END $$;
+ALTER TABLE book ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('french', coalesce(subtitle, '') || ' ' || coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('french', coalesce(description, '')), 'C') ||
+    setweight(to_tsvector('french', coalesce(abstract, '')), 'D')
+) STORED;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_book_fts ON book USING GIN (search_vector);
+
+-- Blog listing / moderation indexes (same as __table_args__ in app/models.py, for existing databases)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_views ON post (views);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_created_views ON post (created_at DESC, views DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_published_created ON post (published, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_pub_id ON post (published, published_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_pub_date ON post (published, coalesce(published_at, created_at) DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_featured ON post (is_featured, published_at DESC) WHERE published AND is_featured;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_published_views ON post (views DESC) WHERE published;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_post_created ON comment (post_id, approved, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_created_id ON comment (created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_status ON comment (approved, is_spam, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_admin_action_log_timestamp_id ON admin_action_log (timestamp DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_book_pub_created_id ON book (is_published, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_book_created_views ON book (created_at DESC, views DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_book_pub_feat_created ON book (is_published, is_featured, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_testimonial_active_created ON testimonial (is_active, created_at);
+DROP INDEX CONCURRENTLY IF EXISTS ix_comment_post_id;
+
+-- Approved comment totals (Post.comment_count in app/models.py, kept up to date by the Comment events)
+ALTER TABLE post ADD COLUMN IF NOT EXISTS comment_count integer NOT NULL DEFAULT 0;
+UPDATE post SET comment_count = c.n
+FROM (SELECT post_id, count(*) AS n FROM comment WHERE approved GROUP BY post_id) c
+WHERE c.post_id = post.id AND post.comment_count <> c.n;
+
+-- Author name copy for listings (Post.author_display_name in app/models.py, same rule as User.full_name)
+ALTER TABLE post ADD COLUMN IF NOT EXISTS author_display_name varchar(130);
+UPDATE post SET author_display_name = CASE
+        WHEN coalesce(u.first_name, '') <> '' AND coalesce(u.last_name, '') <> '' THEN u.first_name || ' ' || u.last_name
+        ELSE u.username
+    END
+FROM "user" u
+WHERE u.id = post.author_id AND post.author_display_name IS NULL;
+
+-- Archive month (Post.published_ym in app/models.py)
+ALTER TABLE post ADD COLUMN IF NOT EXISTS published_ym varchar(7);
+UPDATE post SET published_ym = to_char(published_at, 'YYYY-MM') WHERE published_at IS NOT NULL AND published_ym IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_ym ON post (published_ym, published);
+
+-- Word count stored at write time (Post.word_count in app/models.py); old rows stay
+-- NULL until their next save, the reading_time/excerpt filters fall back meanwhile
+ALTER TABLE post ADD COLUMN IF NOT EXISTS word_count integer;
+
+-- Comment User-Agent fingerprint (Comment.ua_hash in app/models.py)
+ALTER TABLE comment ADD COLUMN IF NOT EXISTS ua_hash bigint;
+ALTER TABLE comment ALTER COLUMN user_agent TYPE varchar(120) USING left(user_agent, 120);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_comment_ua_hash ON comment (ua_hash);
+
+-- Popular posts (Post.trending_score in app/models.py, refreshed after view flushes)
+ALTER TABLE post ADD COLUMN IF NOT EXISTS trending_score double precision NOT NULL DEFAULT 0;
+UPDATE post SET trending_score = views * exp(-extract(epoch FROM (now() AT TIME ZONE 'utc') - published_at) / 86400 / 7.0)
+WHERE published AND published_at > (now() AT TIME ZONE 'utc') - interval '60 days';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_post_trending ON post (published, trending_score DESC);
+
+-- Stored review totals (Book.review_count / Book.avg_rating in app/models.py)
+ALTER TABLE book ADD COLUMN IF NOT EXISTS review_count integer NOT NULL DEFAULT 0;
+ALTER TABLE book ADD COLUMN IF NOT EXISTS avg_rating numeric(3,2) NOT NULL DEFAULT 0;
+UPDATE book SET review_count = r.n, avg_rating = r.avg
+FROM (SELECT book_id, count(*) AS n, avg(rating) AS avg FROM book_review WHERE is_approved GROUP BY book_id) r
+WHERE r.book_id = book.id;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_book_rating ON book (avg_rating DESC, review_count DESC) WHERE is_published;
+
 -- Books table optimization
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_books_category ON books(category);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_books_author_id ON books(author_id);